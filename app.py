@@ -7,14 +7,51 @@ Users can train the model on book files and chat with the AI for writing assista
 """
 
 import os
+import re
 import json
+import gzip
 import logging
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import hashlib
+import shutil
+import sys
+import tempfile
+import uuid
+from flask import Flask, Response, request
 from flask_cors import CORS
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 import threading
 
-from src.chatbot import BookWritingChatbot
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import BaseTarget
+except ImportError:
+    StreamingFormDataParser = None
+    BaseTarget = object
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from src.chatbot import BookWritingChatbot, default_model_path
+from src.uring_io import uring_enabled, write_files
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,25 +61,96 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+# Compress JSON and HTML responses when flask-compress is installed. Streamed
+# responses are left alone so Server-Sent Events are flushed immediately.
+if Compress is not None:
+    app.config.update(
+        COMPRESS_MIN_SIZE=512,
+        COMPRESS_ALGORITHM=['br', 'gzip'],
+        COMPRESS_STREAMS=False
+    )
+    Compress(app)
+
+# Parse /train uploads with streaming-form-data when it is installed;
+# set STREAMING_UPLOADS=0 to fall back to Werkzeug's multipart parser.
+app.config['STREAMING_UPLOADS'] = (
+    StreamingFormDataParser is not None and os.getenv('STREAMING_UPLOADS', '1') != '0'
+)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_COPY_BUFFER = 1 << 20
+# Uploaded books are staged on tmpfs (RAM) when available; override with UPLOAD_TMP_DIR
+UPLOAD_TMP_ROOT = os.getenv('UPLOAD_TMP_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+STATIC_MAX_AGE = 3600
+SSE_KEEPALIVE_SECONDS = 15
+
+class TrainState:
+    """
+    Training status shared between request threads and the training worker.
+    Every update bumps a revision number and wakes anyone waiting on it.
+    """
+    
+    def __init__(self):
+        self._cv = threading.Condition()
+        self._d = {
+            'is_training': False,
+            'status': 'ready',
+            'message': 'Ready to train or chat',
+            'progress': 0,
+            'job_id': None,
+            'stats': None,
+            '_rev': 0
+        }
+    
+    @property
+    def is_training(self) -> bool:
+        return self._d['is_training']
+    
+    def set(self, **fields):
+        """Update status fields and notify waiters."""
+        with self._cv:
+            self._d.update(fields)
+            self._d['_rev'] += 1
+            self._cv.notify_all()
+    
+    def try_start(self, **fields) -> bool:
+        """Mark a training job as running unless one already is."""
+        with self._cv:
+            if self._d['is_training']:
+                return False
+            self._d.update(is_training=True, **fields)
+            self._d['_rev'] += 1
+            self._cv.notify_all()
+            return True
+    
+    def snapshot(self) -> dict:
+        """Consistent copy of the current status."""
+        with self._cv:
+            return dict(self._d)
+    
+    def wait_for_change(self, last_rev: int, timeout: float = None) -> dict:
+        """Block until the revision differs from last_rev or the timeout passes."""
+        with self._cv:
+            self._cv.wait_for(lambda: self._d['_rev'] != last_rev, timeout)
+            return dict(self._d)
+
 # Global chatbot instance
 chatbot = None
-training_status = {
-    'is_training': False,
-    'status': 'ready',
-    'message': 'Ready to train or chat',
-    'progress': 0
-}
-
-def create_template_files():
-    """Create HTML template files for the web interface."""
-    templates_dir = "templates"
-    static_dir = "static"
-    
-    os.makedirs(templates_dir, exist_ok=True)
-    os.makedirs(static_dir, exist_ok=True)
-    
-    # Create main HTML template
-    html_template = """<!DOCTYPE html>
+training_state = TrainState()
+
+# Training runs on a single background worker
+training_executor = ThreadPoolExecutor(max_workers=1)
+
+# Bumped whenever training completes so cached chat replies go stale.
+# Only the training worker writes it.
+model_version = 0
+
+# Model statistics for /model_info, recomputed only when model_version changes
+model_info_cache = {'version': -1, 'payload': None}
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.93'))
+
+# Main HTML page for the web interface
+INDEX_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -406,6 +514,55 @@ def create_template_files():
             messages.scrollTop = messages.scrollHeight;
         }
         
+        function waitForTraining(jobId, status) {
+            // Follow the background training job through server-sent events,
+            // falling back to polling if the event stream is unavailable
+            return new Promise((resolve) => {
+                const events = new EventSource('/training_events');
+                
+                events.onmessage = (event) => {
+                    const data = JSON.parse(event.data);
+                    if (data.job_id !== jobId) return;
+                    
+                    if (!data.is_training) {
+                        events.close();
+                        resolve(data);
+                    } else {
+                        status.innerHTML = `${data.message} (${data.progress}%)`;
+                    }
+                };
+                
+                events.onerror = () => {
+                    events.close();
+                    resolve(pollTraining(jobId, status));
+                };
+            });
+        }
+        
+        async function pollTraining(jobId, status) {
+            // Poll the background training job until it finishes
+            let lastEtag = null;
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, 500));
+                
+                const headers = lastEtag ? { 'If-None-Match': lastEtag } : {};
+                const response = await fetch('/training_status?job_id=' + encodeURIComponent(jobId), { headers });
+                if (response.status === 304) {
+                    continue;
+                }
+                lastEtag = response.headers.get('ETag');
+                const data = await response.json();
+                
+                if (!response.ok) {
+                    return { status: 'error', message: data.error };
+                }
+                if (!data.is_training) {
+                    return data;
+                }
+                status.innerHTML = `${data.message} (${data.progress}%)`;
+            }
+        }
+        
         async function trainModel() {
             if (isTraining) return;
             
@@ -439,10 +596,17 @@ def create_template_files():
                 const data = await response.json();
                 
                 if (data.success) {
-                    status.className = 'status success';
-                    status.innerHTML = `Training completed! Processed ${data.stats.num_books} books with ${data.stats.total_sentences} sentences.`;
-                    addMessage('Training completed! I can now help you with writing based on the books you provided.', 'bot');
-                    getModelInfo();
+                    const result = await waitForTraining(data.job_id, status);
+                    
+                    if (result.status === 'completed') {
+                        status.className = 'status success';
+                        status.innerHTML = `Training completed! Processed ${result.stats.num_books} books with ${result.stats.total_sentences} sentences.`;
+                        addMessage('Training completed! I can now help you with writing based on the books you provided.', 'bot');
+                        getModelInfo();
+                    } else {
+                        status.className = 'status error';
+                        status.innerHTML = 'Training failed: ' + result.message;
+                    }
                 } else {
                     status.className = 'status error';
                     status.innerHTML = 'Training failed: ' + data.error;
@@ -478,10 +642,17 @@ def create_template_files():
                 const data = await response.json();
                 
                 if (data.success) {
-                    status.className = 'status success';
-                    status.innerHTML = `Sample books created and training completed! Processed ${data.stats.num_books} books.`;
-                    addMessage('I\\'ve been trained on sample books and am ready to help with your writing!', 'bot');
-                    getModelInfo();
+                    const result = await waitForTraining(data.job_id, status);
+                    
+                    if (result.status === 'completed') {
+                        status.className = 'status success';
+                        status.innerHTML = `Sample books created and training completed! Processed ${result.stats.num_books} books.`;
+                        addMessage('I\\'ve been trained on sample books and am ready to help with your writing!', 'bot');
+                        getModelInfo();
+                    } else {
+                        status.className = 'status error';
+                        status.innerHTML = 'Failed to create sample books: ' + result.message;
+                    }
                 } else {
                     status.className = 'status error';
                     status.innerHTML = 'Failed to create sample books: ' + data.error;
@@ -519,21 +690,359 @@ def create_template_files():
     </script>
 </body>
 </html>"""
+
+INDEX_HTML_BYTES = INDEX_HTML.encode('utf-8')
+INDEX_HTML_ETAG = hashlib.sha1(INDEX_HTML_BYTES).hexdigest()
+
+# Precompressed variants of the page, in order of preference
+INDEX_HTML_ENCODED = {}
+if brotli is not None:
+    INDEX_HTML_ENCODED['br'] = brotli.compress(INDEX_HTML_BYTES)
+INDEX_HTML_ENCODED['gzip'] = gzip.compress(INDEX_HTML_BYTES, compresslevel=9)
+
+class BookUploadTarget(BaseTarget):
+    """
+    streaming-form-data target that writes every part of the repeated
+    'books' field to its own file in the upload directory.
+    """
+    
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self._prefix = directory + os.sep
+        self.parts_received = 0
+        self.saved_paths = []
+        self._names = set()
+        self._file = None
+    
+    def on_start(self):
+        self.parts_received += 1
+        filename = book_filename(self.multipart_filename, self._names)
+        if filename:
+            filepath = self._prefix + filename
+            self._file = open(filepath, 'wb')
+            self.saved_paths.append(filepath)
+    
+    def on_data_received(self, chunk: bytes):
+        if self._file:
+            self._file.write(chunk)
+    
+    def on_finish(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+def book_filename(filename, used):
+    """
+    Return a safe on-disk name for an uploaded book, or None if it is not a .txt file.
+    
+    Unlike secure_filename this keeps non-ASCII names intact; only directory
+    parts, control characters and leading dots are removed. Names already in
+    `used` get a " (n)" suffix so that books never overwrite each other.
+    """
+    filename = filename or ''
+    if not filename.endswith('.txt'):
+        return None
+    
+    name = os.path.basename(filename.replace('\\', '/'))
+    name = ''.join(c for c in name if c.isprintable()).strip().lstrip('.')
+    stem = name[:-4] if name.endswith('.txt') else ''
+    # Leave room for the suffix within the usual 255-byte name limit
+    stem = stem.encode('utf-8')[:200].decode('utf-8', 'ignore').strip() or 'book'
+    
+    candidate = stem + '.txt'
+    n = 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem} ({n}).txt"
+    used.add(candidate)
+    return candidate
+
+def upload_error(num_uploaded, num_txt):
+    """Build the 400 response for an upload with no usable books, if any."""
+    if num_uploaded == 0:
+        return ojson({
+            'success': False,
+            'error': 'No files uploaded'
+        }, 400)
+    
+    if num_txt == 0:
+        return ojson({
+            'success': False,
+            'error': 'No .txt files found in upload'
+        }, 400)
+    
+    return None
+
+def save_uploads_streaming(temp_dir):
+    """Stream the multipart body straight to disk, bypassing request.files."""
+    target = BookUploadTarget(temp_dir)
+    parser = StreamingFormDataParser(headers=request.headers)
+    parser.register('books', target)
+    
+    while chunk := request.stream.read(UPLOAD_CHUNK_SIZE):
+        parser.data_received(chunk)
+    
+    return target.parts_received, target.saved_paths
+
+def save_upload(file, filepath):
+    """
+    Copy an uploaded file to disk. Uploads Werkzeug spooled to a real temp
+    file are copied in the kernel with os.sendfile on Linux; everything else
+    goes through a 1 MiB copy buffer.
+    """
+    stream = file.stream
+    with open(filepath, 'wb', buffering=0) as dst:
+        src_fd = None
+        # fileno() on a SpooledTemporaryFile still in memory would force it
+        # to roll over to disk, so only ask streams already backed by a file
+        if getattr(stream, '_rolled', True):
+            try:
+                src_fd = stream.fileno()
+            except (AttributeError, OSError):
+                src_fd = None
+        
+        if src_fd is not None and sys.platform == 'linux':
+            start = stream.tell()
+            offset = start
+            remaining = os.fstat(src_fd).st_size - start
+            try:
+                while remaining > 0:
+                    sent = os.sendfile(dst.fileno(), src_fd, offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+                return
+            except OSError:
+                # Fall back to a buffered copy from the beginning
+                stream.seek(start)
+                dst.seek(0)
+                dst.truncate()
+        
+        shutil.copyfileobj(stream, dst, length=UPLOAD_COPY_BUFFER)
+
+def save_uploads_werkzeug(temp_dir, txt_uploads):
+    """
+    Save uploads already parsed by Werkzeug.
+    
+    Args:
+        temp_dir: Directory to save the books to
+        txt_uploads: List of (filename, FileStorage) pairs from book_filename()
+    """
+    # Filenames are already sanitized, so plain concatenation is safe here
+    prefix = temp_dir + os.sep
+    
+    if uring_enabled():
+        # Read every upload up front and hand all writes to io_uring at once
+        batch = [(prefix + filename, file.stream.read())
+                 for filename, file in txt_uploads]
+        write_files(batch)
+        return [filepath for filepath, _ in batch]
+    
+    txt_files = []
+    for filename, file in txt_uploads:
+        filepath = prefix + filename
+        save_upload(file, filepath)
+        txt_files.append(filepath)
+    
+    return txt_files
+
+class SemanticReplyCache:
+    """
+    Approximate reply cache for /chat. Messages are hashed into bag-of-words
+    vectors and a cached reply is reused when a previous message is similar
+    enough by cosine similarity. Entries are evicted first-in, first-out.
+    """
+    
+    def __init__(self, capacity: int = 4096, dims: int = 256, threshold: float = 0.93):
+        self.capacity = capacity
+        self.dims = dims
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vecs = np.zeros((capacity, dims), dtype=np.float32)
+        self._replies = [None] * capacity
+        self._size = 0
+        self._next = 0
+        self._version = None
+    
+    _TOKEN_RE = re.compile(r'\w+')
+    
+    def _vectorize(self, message: str):
+        """Hash message tokens into an L2-normalized bag-of-words vector."""
+        vec = np.zeros(self.dims, dtype=np.float32)
+        for token in self._TOKEN_RE.findall(message):
+            vec[hash(token) % self.dims] += 1.0
+        
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+    
+    def _sync_version(self, version: int):
+        """Drop every entry when the model has been retrained."""
+        if version != self._version:
+            self._replies = [None] * self.capacity
+            self._size = 0
+            self._next = 0
+            self._version = version
+    
+    def lookup(self, message: str, version: int):
+        """Return the reply cached for the most similar message, if any."""
+        vec = self._vectorize(message)
+        if vec is None:
+            return None
+        
+        with self._lock:
+            self._sync_version(version)
+            if not self._size:
+                return None
+            
+            sims = self._vecs[:self._size] @ vec
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold:
+                return self._replies[best]
+        
+        return None
+    
+    def add(self, message: str, reply: str, version: int):
+        """Cache a reply, overwriting the oldest entry once full."""
+        vec = self._vectorize(message)
+        if vec is None:
+            return
+        
+        with self._lock:
+            self._sync_version(version)
+            self._vecs[self._next] = vec
+            self._replies[self._next] = reply
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+class ReplyCache:
+    """
+    Exact-match reply cache for /chat, keyed by normalized message and model
+    version. Least recently used entries are evicted once maxsize is reached.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._replies = OrderedDict()
     
-    with open(os.path.join(templates_dir, "index.html"), "w", encoding="utf-8") as f:
-        f.write(html_template)
+    def get_or_compute(self, message: str, version: int, compute):
+        """
+        Return (reply, hit) for message. On a miss compute() is called outside
+        the lock, so slow replies do not block other requests.
+        """
+        key = (message, version)
+        with self._lock:
+            reply = self._replies.get(key)
+            if reply is not None:
+                self._replies.move_to_end(key)
+                return reply, True
+        
+        reply = compute()
+        with self._lock:
+            self._replies[key] = reply
+            self._replies.move_to_end(key)
+            while len(self._replies) > self.maxsize:
+                self._replies.popitem(last=False)
+        return reply, False
+    
+    def clear(self):
+        with self._lock:
+            self._replies.clear()
+
+reply_cache = ReplyCache()
+
+# The semantic cache needs NumPy; without it only exact repeats are cached
+semantic_cache = SemanticReplyCache(threshold=SEMANTIC_CACHE_THRESHOLD) if np is not None else None
+
+def json_bytes(obj):
+    """Serialize obj to JSON bytes, with orjson when it is installed."""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode('utf-8')
+
+def json_loads(raw):
+    """Parse JSON bytes, with orjson when it is installed."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def ojson(obj, status=200):
+    """Build a JSON response from obj."""
+    return app.response_class(json_bytes(obj), status=status, mimetype='application/json')
 
 # Initialize chatbot
 def init_chatbot():
     global chatbot
     chatbot = BookWritingChatbot()
+    reply_cache.clear()
+    model_info_cache.update(version=-1, payload=None)
     logger.info("Chatbot initialized")
 
+def start_training_job(job_id, books_directory, upload_dir=None, **fields):
+    """
+    Claim the training slot and queue a training run on the worker thread.
+    
+    Returns False if another training job is already running.
+    """
+    if not training_state.try_start(job_id=job_id, progress=0, stats=None, **fields):
+        return False
+    
+    training_executor.submit(run_training, job_id, books_directory, upload_dir)
+    return True
+
+def run_training(job_id, books_directory, upload_dir=None):
+    """Train the chatbot in the background and record the outcome."""
+    global model_version
+    
+    def report_progress(progress, message):
+        training_state.set(progress=progress, message=message)
+    
+    try:
+        stats = chatbot.train_from_books(
+            books_directory,
+            save_model_path=default_model_path(),
+            progress_callback=report_progress
+        )
+        model_version += 1
+        training_state.set(
+            is_training=False,
+            status='completed',
+            message='Training completed successfully',
+            progress=100,
+            stats=stats
+        )
+    except Exception as e:
+        logger.error(f"Training error (job {job_id}): {str(e)}")
+        training_state.set(
+            is_training=False,
+            status='error',
+            message=str(e)
+        )
+    finally:
+        # Clean up temporary files
+        if upload_dir is not None:
+            upload_dir.cleanup()
+
 @app.route('/')
 def index():
     """Serve the main web interface."""
-    create_template_files()  # Ensure templates exist
-    return render_template('index.html')
+    encoding = request.accept_encodings.best_match(list(INDEX_HTML_ENCODED))
+    if encoding:
+        response = Response(INDEX_HTML_ENCODED[encoding], mimetype='text/html')
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f'{INDEX_HTML_ETAG}-{encoding}')
+    else:
+        response = Response(INDEX_HTML_BYTES, mimetype='text/html')
+        response.set_etag(INDEX_HTML_ETAG)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_MAX_AGE
+    return response.make_conditional(request)
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Let browsers cache static assets."""
+    if request.endpoint == 'static':
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+    return response
 
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -541,32 +1050,53 @@ def chat():
     global chatbot
     
     if not chatbot:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Chatbot not initialized'
         })
     
     try:
-        data = request.get_json()
+        # Read the body without caching it on the request
+        raw = request.get_data(cache=False)
+        data = json_loads(raw) if raw else {}
         user_message = data.get('message', '')
         
         if not user_message:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'No message provided'
             })
         
-        # Get response from chatbot
-        response = chatbot.chat(user_message)
+        # Get response from chatbot, reusing replies to repeated messages.
+        # The normalized message is only the cache key; the bot always sees
+        # the original text.
+        norm_msg = " ".join(user_message.lower().split())
+        version = model_version
+        response = semantic_cache.lookup(norm_msg, version) if semantic_cache else None
+        
+        if response is not None:
+            cache_status = 'SEMANTIC'
+        else:
+            response, hit = reply_cache.get_or_compute(
+                norm_msg, version, lambda: chatbot.chat(user_message))
+            cache_status = 'HIT' if hit else 'MISS'
+            if semantic_cache:
+                semantic_cache.add(norm_msg, response, version)
         
-        return jsonify({
+        if cache_status != 'MISS':
+            # chatbot.chat() did not run, so record the turn here
+            chatbot.record_turn(user_message, response)
+        
+        result = ojson({
             'success': True,
             'response': response
         })
+        result.headers['X-Cache'] = cache_status
+        return result
         
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
         })
@@ -574,120 +1104,100 @@ def chat():
 @app.route('/train', methods=['POST'])
 def train():
     """Handle model training from uploaded files."""
-    global chatbot, training_status
+    global chatbot
     
     if not chatbot:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Chatbot not initialized'
         })
     
-    if training_status['is_training']:
-        return jsonify({
+    if training_state.is_training:
+        return ojson({
             'success': False,
             'error': 'Training already in progress'
         })
     
-    try:
-        # Get uploaded files
+    job_id = uuid.uuid4().hex
+    
+    txt_uploads = None
+    if not app.config['STREAMING_UPLOADS']:
+        # Werkzeug has already parsed the form, so reject bad uploads before touching the disk
         uploaded_files = request.files.getlist('books')
-        
-        if not uploaded_files or len(uploaded_files) == 0:
-            return jsonify({
-                'success': False,
-                'error': 'No files uploaded'
-            })
-        
-        # Create temporary directory for uploaded books
-        temp_dir = 'temp_books'
-        os.makedirs(temp_dir, exist_ok=True)
-        
+        used_names = set()
+        txt_uploads = [(filename, file) for file in uploaded_files
+                       if (filename := book_filename(file.filename, used_names))]
+        error = upload_error(len(uploaded_files), len(txt_uploads))
+        if error:
+            return error
+    
+    # Create temporary directory for uploaded books
+    upload_dir = tempfile.TemporaryDirectory(prefix='books_', dir=UPLOAD_TMP_ROOT)
+    temp_dir = upload_dir.name
+    handed_off = False
+    
+    try:
         # Save uploaded files
-        txt_files = []
-        for file in uploaded_files:
-            if file.filename.endswith('.txt'):
-                filepath = os.path.join(temp_dir, file.filename)
-                file.save(filepath)
-                txt_files.append(filepath)
-        
-        if not txt_files:
-            return jsonify({
+        if txt_uploads is None:
+            num_uploaded, txt_files = save_uploads_streaming(temp_dir)
+            error = upload_error(num_uploaded, len(txt_files))
+            if error:
+                return error
+        else:
+            txt_files = save_uploads_werkzeug(temp_dir, txt_uploads)
+        
+        if not start_training_job(job_id, temp_dir, upload_dir=upload_dir,
+                                  status='training', message='Training model...'):
+            return ojson({
                 'success': False,
-                'error': 'No .txt files found in upload'
+                'error': 'Training already in progress'
             })
         
-        # Start training
-        training_status['is_training'] = True
-        training_status['status'] = 'training'
-        training_status['message'] = 'Training model...'
-        
-        # Train the model
-        stats = chatbot.train_from_books(temp_dir, save_model_path='trained_model.json')
-        
-        # Clean up temporary files
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        
-        training_status['is_training'] = False
-        training_status['status'] = 'completed'
-        training_status['message'] = 'Training completed successfully'
-        
-        return jsonify({
+        handed_off = True
+        return ojson({
             'success': True,
-            'stats': stats,
-            'message': 'Model trained successfully'
-        })
+            'job_id': job_id,
+            'message': 'Training started'
+        }, 202)
         
     except Exception as e:
-        training_status['is_training'] = False
-        training_status['status'] = 'error'
-        training_status['message'] = str(e)
-        
-        logger.error(f"Training error: {str(e)}")
-        return jsonify({
+        logger.error(f"Upload error: {str(e)}")
+        return ojson({
             'success': False,
             'error': str(e)
         })
+    
+    finally:
+        # Once queued, the training worker owns the upload directory
+        if not handed_off:
+            upload_dir.cleanup()
 
 @app.route('/create_sample_books', methods=['POST'])
 def create_sample_books():
     """Create sample books and train the model."""
-    global chatbot, training_status
+    global chatbot
     
     if not chatbot:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Chatbot not initialized'
         })
     
-    try:
-        training_status['is_training'] = True
-        training_status['status'] = 'creating'
-        training_status['message'] = 'Creating sample books...'
-        
-        # Train on sample books (will create them automatically)
-        stats = chatbot.train_from_books('sample_books', save_model_path='trained_model.json')
-        
-        training_status['is_training'] = False
-        training_status['status'] = 'completed'
-        training_status['message'] = 'Sample books created and training completed'
-        
-        return jsonify({
-            'success': True,
-            'stats': stats,
-            'message': 'Sample books created and model trained successfully'
-        })
-        
-    except Exception as e:
-        training_status['is_training'] = False
-        training_status['status'] = 'error'
-        training_status['message'] = str(e)
-        
-        logger.error(f"Sample books creation error: {str(e)}")
-        return jsonify({
+    job_id = uuid.uuid4().hex
+    
+    # Train on sample books (will create them automatically)
+    if not start_training_job(job_id, 'sample_books',
+                              status='creating', message='Creating sample books...'):
+        return ojson({
             'success': False,
-            'error': str(e)
+            'error': 'Training already in progress'
         })
+    
+    return ojson({
+        'success': True,
+        'job_id': job_id,
+        'message': 'Sample book training started'
+    }, 202)
 
 @app.route('/model_info')
 def model_info():
@@ -695,21 +1205,27 @@ def model_info():
     global chatbot
     
     if not chatbot:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'Chatbot not initialized'
         })
     
     try:
-        info = chatbot.model.get_model_stats()
-        return jsonify({
+        version = model_version
+        if model_info_cache['version'] != version:
+            info = chatbot.model.get_model_stats()
+            model_info_cache.update(version=version, payload=info)
+        else:
+            info = model_info_cache['payload']
+        
+        return ojson({
             'success': True,
             'info': info
         })
         
     except Exception as e:
         logger.error(f"Model info error: {str(e)}")
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
         })
@@ -717,17 +1233,59 @@ def model_info():
 @app.route('/training_status')
 def get_training_status():
     """Get the current training status."""
-    return jsonify(training_status)
+    status = training_state.snapshot()
+    
+    job_id = request.args.get('job_id')
+    if job_id and job_id != status['job_id']:
+        return ojson({
+            'success': False,
+            'error': 'Unknown training job'
+        }, 404)
+    
+    # The revision changes on every status update, so it doubles as an ETag
+    etag = f'"{status["_rev"]}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = app.response_class(status=304)
+    else:
+        response = ojson(status)
+    response.headers['ETag'] = etag
+    return response
+
+@app.route('/training_events')
+def training_events():
+    """Stream training status changes to the browser as Server-Sent Events."""
+    def generate():
+        last_rev = -1
+        while True:
+            status = training_state.wait_for_change(last_rev, timeout=SSE_KEEPALIVE_SECONDS)
+            
+            if status['_rev'] == last_rev:
+                # Comment line keeps idle connections open through proxies
+                yield b': keep-alive\n\n'
+                continue
+            
+            last_rev = status['_rev']
+            yield b'data: ' + json_bytes(status) + b'\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+def run_server(host='0.0.0.0', port=5000, threads=8):
+    """Serve the app with waitress, or Flask's threaded server if it is missing."""
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress is not installed; using Flask's development server")
+        app.run(host=host, port=port, debug=False, threaded=True)
+    else:
+        serve(app, host=host, port=port, threads=threads)
 
 if __name__ == '__main__':
     init_chatbot()
     
-    # Create templates directory and files if they don't exist
-    create_template_files()
-    
     print("🚀 Starting Book Writing AI Chatbot Web Server...")
     print("📚 Upload .txt book files to train the AI")
     print("💬 Chat with the AI for writing assistance")
     print("🌐 Access the application at: http://localhost:5000")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    run_server()
\ No newline at end of file
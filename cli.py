@@ -7,48 +7,190 @@ Supports training the model on book files and interactive chat sessions.
 """
 
 import os
+import re
 import sys
+import time
+import atexit
+import hashlib
 import argparse
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional
 import json
 
-from src.chatbot import BookWritingChatbot
-
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+HISTORY_FILE = os.path.expanduser("~/.book_writing_chatbot_history")
+HISTORY_LENGTH = 1000
+TRAINING_POLL_SECONDS = 0.5
+
+# Signature of the sample books and the model trained from them
+SAMPLE_SIGNATURE_FILE = os.path.expanduser("~/.cache/myext/sample_books.sig")
+
+_TRAIN_RE = re.compile(r'^\s*train\s+(\S.*)$', re.IGNORECASE)
+
+HELP_TEXT = """
+📚 Available Commands:
+  help              - Show this help message
+  status            - Show model training status and statistics
+  train <directory> - Train model on .txt files in directory
+  sample            - Create sample books and train model
+  clear             - Clear conversation history
+  save              - Save conversation to file
+  quit/exit/bye     - End conversation
+
+💡 Writing Assistant Features:
+  - Ask me to continue text: 'Continue this: Once upon a time...'
+  - Request story generation: 'Generate a story about adventure'
+  - Get character ideas: 'Help me develop a character'
+  - Plot suggestions: 'Suggest a plot for my mystery novel'
+  - Writing style analysis: 'What writing style did you learn?'
+"""
+
 class BookWritingCLI:
     """Command line interface for the Book Writing AI Chatbot."""
     
+    # Words that end the interactive session
+    _EXIT_CMDS = frozenset(['quit', 'exit', 'bye'])
+    
     def __init__(self):
+        # Imported here for the same reason as in initialize_chatbot()
+        from src.chatbot import default_model_path
+        
         self.chatbot = None
-        self.model_path = "trained_model.json"
+        self.model_path = default_model_path()
+        self._stats_cache = None
+        self._history_enabled = False
+        
+        # Training runs on a worker thread so the interactive prompt stays usable
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._training = None
+        self._training_progress = (0, "")
+        
+        # Interactive commands that take no arguments
+        self._commands = {
+            'help': self.show_help,
+            'status': self.show_status,
+            'sample': self.create_sample_books,
+            'clear': self.clear_conversation,
+            'save': self.save_conversation,
+        }
+    
+    def _enable_history(self):
+        """Use readline for line editing and keep prompt history across sessions."""
+        if self._history_enabled:
+            return
+        
+        try:
+            import readline
+        except ImportError:
+            # Not available on every platform; input() still works without it
+            return
+        
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except (FileNotFoundError, OSError):
+            pass
+        readline.set_history_length(HISTORY_LENGTH)
+        atexit.register(self._save_history, readline)
+        self._history_enabled = True
+    
+    @staticmethod
+    def _save_history(readline):
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError as e:
+            logger.debug(f"Could not save history: {str(e)}")
         
     def initialize_chatbot(self, model_path: Optional[str] = None):
         """Initialize the chatbot, optionally loading an existing model."""
         if model_path:
             self.model_path = model_path
-            
-        self.chatbot = BookWritingChatbot(model_path=self.model_path if os.path.exists(self.model_path) else None)
         
-        if os.path.exists(self.model_path):
+        # Imported here so --help and argument errors skip loading the model stack
+        from src.chatbot import BookWritingChatbot
+        
+        self.chatbot = BookWritingChatbot(model_path=self.model_path)
+        
+        if self.chatbot.loaded_model_path:
             print(f"✅ Loaded existing model from {self.model_path}")
         else:
             print("🆕 Initialized new chatbot (no existing model found)")
     
-    def train_model(self, books_directory: str, save_path: Optional[str] = None):
-        """Train the chatbot on books from a directory."""
+    def train_model(self, books_directory: str, save_path: Optional[str] = None, background: bool = False):
+        """
+        Train the chatbot on books from a directory.
+        
+        With background set (an interactive session follows), Ctrl-C returns
+        while training continues and the session reports the results later.
+        Otherwise training cannot be interrupted, so Ctrl-C only stops the
+        progress display and the results are printed once it finishes.
+        """
         if not self.chatbot:
             self.initialize_chatbot()
         
+        if self._training_busy():
+            return
+        
         print(f"📚 Training model on books from: {books_directory}")
-        print("⏳ This may take a few minutes...")
+        if background:
+            print("⏳ This may take a few minutes... (Ctrl-C to keep training in the background)")
+        else:
+            print("⏳ This may take a few minutes...")
+        
+        save_path = save_path or self.model_path
+        self._training_progress = (0, "")
+        future = self._executor.submit(
+            self.chatbot.train_from_books,
+            books_directory,
+            save_model_path=save_path,
+            progress_callback=self._on_training_progress
+        )
+        self._training = (future, save_path)
+        
+        shown = None
+        try:
+            while True:
+                wait((future,), timeout=TRAINING_POLL_SECONDS)
+                
+                if self._training_progress != shown:
+                    shown = self._training_progress
+                    print(f"   [{shown[0]:3d}%] {shown[1]}")
+                
+                if future.done():
+                    break
+        except KeyboardInterrupt:
+            if background:
+                print("\n⏳ Training continues in the background; results will be shown when it finishes.")
+                return
+            print("\n⏳ Training cannot be cancelled; waiting for it to finish...")
+            wait((future,))
+        
+        self._finish_training()
+    
+    def _on_training_progress(self, progress: int, message: str):
+        self._training_progress = (progress, message)
+    
+    def _training_busy(self) -> bool:
+        """Report and return True if a background training run is still going."""
+        if self._training and not self._training[0].done():
+            progress, message = self._training_progress
+            print(f"⏳ Training in progress ({progress}%: {message}). Please wait for it to finish.")
+            return True
+        return False
+    
+    def _finish_training(self):
+        """Print the outcome of a finished training run, once."""
+        if not self._training or not self._training[0].done():
+            return
+        
+        future, save_path = self._training
+        self._training = None
         
         try:
-            save_path = save_path or self.model_path
-            stats = self.chatbot.train_from_books(books_directory, save_model_path=save_path)
+            stats = future.result()
             
             print("\n✅ Training completed successfully!")
             print(f"📊 Training Statistics:")
@@ -72,11 +214,29 @@ class BookWritingCLI:
         if not self.chatbot:
             self.initialize_chatbot()
         
-        print(f"📝 Creating sample books in: {output_dir}")
+        if self._training_busy():
+            return
         
         try:
-            # Create sample books and train
+            if os.path.isdir(output_dir) and any(f.endswith('.txt') for f in os.listdir(output_dir)):
+                # Nothing to do if neither the books nor the model changed since the last run
+                stored = self._read_sample_signature()
+                current = self._sample_signature(output_dir)
+                if (stored is not None and stored == current
+                        and os.path.exists(self.model_path)):
+                    # The CLI always saves to model_path, so a trained model is already this one
+                    if not self.chatbot.model.is_trained:
+                        self.chatbot.model.load_model(self.model_path)
+                        self.chatbot._stats_dirty = True
+                    print(f"✅ Sample books unchanged, reusing model: {self.model_path}")
+                    return
+                print(f"📝 Reusing existing sample books in: {output_dir}")
+            else:
+                print(f"📝 Creating sample books in: {output_dir}")
+            
+            # Create sample books if needed and train
             stats = self.chatbot.train_from_books(output_dir, save_model_path=self.model_path)
+            self._write_sample_signature(self._sample_signature(output_dir))
             
             print("✅ Sample books created and model trained!")
             print(f"📊 Processed {stats['num_books']} sample books")
@@ -86,6 +246,42 @@ class BookWritingCLI:
             print(f"❌ Failed to create sample books: {str(e)}")
             logger.error(f"Sample books error: {str(e)}")
     
+    def _sample_signature(self, output_dir: str) -> Optional[str]:
+        """Hash the sample book listing together with the saved model file."""
+        if not os.path.exists(self.model_path):
+            return None
+        
+        digest = hashlib.sha1()
+        entries = sorted(
+            (entry for entry in os.scandir(output_dir) if entry.name.endswith('.txt')),
+            key=lambda entry: entry.name
+        )
+        for entry in entries:
+            st = entry.stat()
+            digest.update(f"{entry.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+        
+        # The model's mtime changes whenever anything retrains it
+        st = os.stat(self.model_path)
+        digest.update(f"{os.path.abspath(self.model_path)}\0{st.st_mtime_ns}".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _read_sample_signature(self) -> Optional[str]:
+        try:
+            with open(SAMPLE_SIGNATURE_FILE, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def _write_sample_signature(self, signature: Optional[str]):
+        if signature is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(SAMPLE_SIGNATURE_FILE), exist_ok=True)
+            with open(SAMPLE_SIGNATURE_FILE, 'w', encoding='utf-8') as f:
+                f.write(signature)
+        except OSError as e:
+            logger.debug(f"Could not write sample signature: {str(e)}")
+    
     def interactive_chat(self):
         """Start an interactive chat session."""
         if not self.chatbot:
@@ -104,52 +300,44 @@ class BookWritingCLI:
         
         print("\nAI: Hello! I'm your book writing assistant. How can I help you today?")
         
+        self._enable_history()
+        
         while True:
             try:
                 user_input = input("\nYou: ").strip()
                 
+                # Report a background training run that finished since the last prompt
+                self._finish_training()
+                
                 if not user_input:
                     continue
                 
                 # Handle special commands
-                if user_input.lower() in ['quit', 'exit', 'bye']:
+                command = user_input.lower()
+                if command in self._EXIT_CMDS:
                     print("\nAI: Goodbye! Happy writing! 📚✨")
                     break
                 
-                elif user_input.lower() == 'help':
-                    self.show_help()
+                handler = self._commands.get(command)
+                if handler:
+                    handler()
                     continue
                 
-                elif user_input.lower() == 'status':
-                    self.show_status()
+                # Input is already stripped, so a match always has a directory
+                train_match = _TRAIN_RE.match(user_input)
+                if train_match:
+                    self.train_model(train_match.group(1), background=True)
                     continue
                 
-                elif user_input.lower().startswith('train '):
-                    directory = user_input[6:].strip()
-                    if directory:
-                        self.train_model(directory)
-                    else:
-                        print("Please specify a directory: train <directory>")
-                    continue
-                
-                elif user_input.lower() == 'sample':
-                    self.create_sample_books()
-                    continue
-                
-                elif user_input.lower() == 'clear':
-                    self.chatbot.clear_conversation_history()
-                    print("Conversation history cleared.")
-                    continue
-                
-                elif user_input.lower() == 'save':
-                    self.save_conversation()
+                # The model is being rebuilt while training runs
+                if self._training_busy():
                     continue
                 
                 # Get response from chatbot
                 response = self.chatbot.chat(user_input)
                 print(f"\nAI: {response}")
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\nAI: Goodbye! Happy writing! 📚✨")
                 break
             except Exception as e:
@@ -158,20 +346,8 @@ class BookWritingCLI:
     
     def show_help(self):
         """Show available commands."""
-        print("\n📚 Available Commands:")
-        print("  help              - Show this help message")
-        print("  status            - Show model training status and statistics")
-        print("  train <directory> - Train model on .txt files in directory")
-        print("  sample            - Create sample books and train model")
-        print("  clear             - Clear conversation history")
-        print("  save              - Save conversation to file")
-        print("  quit/exit/bye     - End conversation")
-        print("\n💡 Writing Assistant Features:")
-        print("  - Ask me to continue text: 'Continue this: Once upon a time...'")
-        print("  - Request story generation: 'Generate a story about adventure'")
-        print("  - Get character ideas: 'Help me develop a character'")
-        print("  - Plot suggestions: 'Suggest a plot for my mystery novel'")
-        print("  - Writing style analysis: 'What writing style did you learn?'")
+        sys.stdout.write(HELP_TEXT)
+        sys.stdout.flush()
     
     def show_status(self):
         """Show model status and statistics."""
@@ -179,27 +355,55 @@ class BookWritingCLI:
             print("Chatbot not initialized.")
             return
         
-        stats = self.chatbot.model.get_model_stats()
-        text_stats = self.chatbot.text_processor.get_statistics()
+        # Statistics only change when the model is retrained. 'status' is an
+        # interactive command and each CLI run is its own process, so this
+        # cache only spares repeated 'status' calls within one session
+        if self._stats_cache is None or self.chatbot._stats_dirty:
+            stats = self.chatbot.model.get_model_stats(top_k=5)
+            self._stats_cache = {
+                'model': stats,
+                'text': self.chatbot.text_processor.get_statistics(),
+                'top_words': tuple(word for word, count in stats['most_common_words'])
+            }
+            self.chatbot._stats_dirty = False
+        
+        stats = self._stats_cache['model']
+        text_stats = self._stats_cache['text']
+        top_words = self._stats_cache['top_words']
         
-        print("\n📊 Model Status:")
-        print(f"  Trained: {'Yes' if stats['is_trained'] else 'No'}")
-        print(f"  Vocabulary size: {stats['vocabulary_size']:,} words")
-        print(f"  N-gram size: {stats['n_gram_size']}")
-        print(f"  Total patterns: {stats['total_n_grams']:,}")
+        # Build the whole report first and write it in one go
+        lines = [
+            "",
+            "📊 Model Status:",
+            f"  Trained: {'Yes' if stats['is_trained'] else 'No'}",
+            f"  Vocabulary size: {stats['vocabulary_size']:,} words",
+            f"  N-gram size: {stats['n_gram_size']}",
+            f"  Total patterns: {stats['total_n_grams']:,}",
+        ]
         
-        if stats['most_common_words']:
-            top_words = [word for word, count in stats['most_common_words'][:5]]
-            print(f"  Top words: {', '.join(top_words)}")
+        if stats['is_trained'] and top_words:
+            lines.append(f"  Top words: {', '.join(top_words)}")
         
         if text_stats:
-            print(f"\n📚 Training Data:")
-            print(f"  Books processed: {text_stats['num_books']}")
-            print(f"  Total sentences: {text_stats['total_sentences']:,}")
-            print(f"  Total words: {text_stats['total_words']:,}")
+            lines += [
+                "",
+                "📚 Training Data:",
+                f"  Books processed: {text_stats['num_books']}",
+                f"  Total sentences: {text_stats['total_sentences']:,}",
+                f"  Total words: {text_stats['total_words']:,}",
+            ]
         
         conversation_count = len(self.chatbot.get_conversation_history())
-        print(f"\n💬 Conversation: {conversation_count} messages")
+        lines += ["", f"💬 Conversation: {conversation_count} messages"]
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    
+    def clear_conversation(self):
+        """Clear the conversation history."""
+        self.chatbot.clear_conversation_history()
+        self.chatbot._stats_dirty = True
+        print("Conversation history cleared.")
     
     def save_conversation(self):
         """Save conversation history to a file."""
@@ -212,7 +416,7 @@ class BookWritingCLI:
             print("No conversation to save.")
             return
         
-        filename = f"conversation_{len(history)}messages.json"
+        filename = f"conversation_{time.strftime('%Y%m%dT%H%M%S')}_{len(history)}.jsonl"
         try:
             self.chatbot.save_conversation(filename)
             print(f"💾 Conversation saved to: {filename}")
@@ -226,6 +430,53 @@ class BookWritingCLI:
         
         response = self.chatbot.chat(message)
         return response
+    
+    def batch_responses(self, messages: List[str]) -> List[str]:
+        """Get responses to several messages in one batch."""
+        if not self.chatbot:
+            self.initialize_chatbot()
+        
+        return self.chatbot.chat_many(messages)
+
+def print_responses(cli: BookWritingCLI, messages: List[str]):
+    """Print the chatbot's responses to one or more messages."""
+    if len(messages) == 1:
+        print(f"AI: {cli.single_response(messages[0])}")
+        return
+    
+    for message, response in zip(messages, cli.batch_responses(messages)):
+        print(f"You: {message}")
+        print(f"AI: {response}\n")
+
+def run_train(cli: BookWritingCLI, args):
+    cli.train_model(args.directory, args.save_model or cli.model_path)
+
+def run_sample(cli: BookWritingCLI, args):
+    cli.create_sample_books()
+
+def run_message(cli: BookWritingCLI, args):
+    print_responses(cli, args.texts)
+
+def run_chat(cli: BookWritingCLI, args):
+    cli.interactive_chat()
+
+def run_legacy(cli: BookWritingCLI, args):
+    """Handle the original flag-style invocation (no subcommand)."""
+    # Training operations
+    if args.sample:
+        cli.create_sample_books()
+    
+    if args.train:
+        save_path = args.save_model or cli.model_path
+        cli.train_model(args.train, save_path, background=args.interactive)
+    
+    # Chat operations
+    if args.message:
+        print_responses(cli, args.message)
+    
+    # Interactive mode (default if no other operations)
+    if args.interactive or (not args.train and not args.sample and not args.message):
+        cli.interactive_chat()
 
 def main():
     """Main CLI entry point."""
@@ -235,9 +486,16 @@ def main():
         epilog="""
 Examples:
   %(prog)s                                    # Start interactive chat
+  %(prog)s train books/                       # Train on books in directory
+  %(prog)s sample                             # Create sample books and train
+  %(prog)s message "Write a story" "Suggest a plot"  # Responses to messages
+  %(prog)s chat                               # Start interactive chat
+
+Flag style (same operations, can be combined):
   %(prog)s --train books/                     # Train on books in directory
   %(prog)s --sample                           # Create sample books and train
   %(prog)s --message "Help me write a story"  # Get single response
+  %(prog)s -m "Write a story" -m "Suggest a plot"  # Several responses in one batch
   %(prog)s --train books/ --interactive       # Train then start chat
         """
     )
@@ -263,19 +521,20 @@ Examples:
     parser.add_argument(
         '--message', '-m',
         metavar='TEXT',
-        help='Send a single message and get response'
+        action='append',
+        help='Send a message and get response (repeat to send several in one batch)'
     )
     
     parser.add_argument(
         '--model', '-M',
         metavar='PATH',
-        help='Path to saved model file (default: trained_model.json)'
+        help='Path to saved model file, .npz or .json (default: trained_model.npz, or an existing trained_model.json)'
     )
     
     parser.add_argument(
         '--save-model', '-S',
         metavar='PATH',
-        help='Path to save trained model (default: trained_model.json)'
+        help='Path to save trained model; .npz is binary, anything else JSON (default: trained_model.npz)'
     )
     
     parser.add_argument(
@@ -284,6 +543,25 @@ Examples:
         help='Enable verbose logging'
     )
     
+    # Each subcommand runs exactly one operation; without one, the flags above apply
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    
+    train_parser = subparsers.add_parser('train', help='Train model on .txt book files in directory')
+    train_parser.add_argument('directory', metavar='DIRECTORY')
+    train_parser.set_defaults(func=run_train)
+    
+    sample_parser = subparsers.add_parser('sample', help='Create sample books and train model')
+    sample_parser.set_defaults(func=run_sample)
+    
+    message_parser = subparsers.add_parser('message', help='Send messages and print the responses')
+    message_parser.add_argument('texts', metavar='TEXT', nargs='+')
+    message_parser.set_defaults(func=run_message)
+    
+    chat_parser = subparsers.add_parser('chat', help='Start interactive chat mode')
+    chat_parser.set_defaults(func=run_chat)
+    
+    parser.set_defaults(func=run_legacy)
+    
     args = parser.parse_args()
     
     # Configure logging level
@@ -297,23 +575,7 @@ Examples:
     if args.model:
         cli.model_path = args.model
     
-    # Training operations
-    if args.sample:
-        cli.create_sample_books()
-    
-    if args.train:
-        save_path = args.save_model or cli.model_path
-        cli.train_model(args.train, save_path)
-    
-    # Chat operations
-    if args.message:
-        cli.initialize_chatbot()
-        response = cli.single_response(args.message)
-        print(f"AI: {response}")
-    
-    # Interactive mode (default if no other operations)
-    if args.interactive or (not args.train and not args.sample and not args.message):
-        cli.interactive_chat()
+    args.func(cli, args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -10,6 +10,9 @@ Main Components:
 - SimpleLanguageModel: N-gram based language model for text generation
 - BookWritingChatbot: Main chatbot interface with conversation management
 
+When NumPy, NLTK or pandas are missing, TextProcessor and SimpleLanguageModel
+resolve to their built-in-libraries versions instead.
+
 Usage:
     from src.chatbot import BookWritingChatbot
     
@@ -18,12 +21,44 @@ Usage:
     response = chatbot.chat("Help me write a story about adventure")
 """
 
-from .text_processor import TextProcessor
-from .simple_model import SimpleLanguageModel
-from .chatbot import BookWritingChatbot
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "AI Assistant"
 __description__ = "AI Chatbot for Book Writing Assistance"
 
-__all__ = ["TextProcessor", "SimpleLanguageModel", "BookWritingChatbot"]
\ No newline at end of file
+__all__ = ["TextProcessor", "SimpleLanguageModel", "BookWritingChatbot"]
+
+# Submodules are imported on first attribute access (PEP 562) so that
+# importing the package does not pull in numpy, nltk and pandas up front.
+# Each name lists its implementations in order of preference.
+_LAZY_ATTRS = {
+    "TextProcessor": [(".text_processor", "TextProcessor"),
+                      (".text_processor_builtin", "TextProcessorBuiltin")],
+    "SimpleLanguageModel": [(".simple_model", "SimpleLanguageModel"),
+                            (".simple_model_builtin", "SimpleLanguageModelBuiltin")],
+    "BookWritingChatbot": [(".chatbot", "BookWritingChatbot")],
+}
+
+def __getattr__(name):
+    candidates = _LAZY_ATTRS.get(name)
+    if candidates is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    for module_name, attr in candidates[:-1]:
+        try:
+            module = importlib.import_module(module_name, __name__)
+        except ImportError:
+            continue
+        break
+    else:
+        module_name, attr = candidates[-1]
+        module = importlib.import_module(module_name, __name__)
+    
+    # Cache the resolved class so later lookups skip __getattr__
+    value = getattr(module, attr)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
@@ -2,25 +2,134 @@ import os
 import json
 import logging
 import re
-from typing import List, Dict, Optional, Tuple
+import tempfile
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Deque, Iterable, List, Dict, Optional, Tuple, Union
 from datetime import datetime
+from pathlib import Path
 
-from .text_processor import TextProcessor
-from .simple_model import SimpleLanguageModel
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from .text_processor import TextProcessor
+except ImportError:
+    from .text_processor_builtin import TextProcessorBuiltin as TextProcessor
+
+try:
+    from .simple_model import SimpleLanguageModel
+except ImportError:
+    from .simple_model_builtin import SimpleLanguageModelBuiltin as SimpleLanguageModel
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Conversation turns kept in memory unless a different cap is given
+DEFAULT_HISTORY_CAP = 1000
+
+# Default model file of the CLI and web app, and the JSON file older versions wrote
+DEFAULT_MODEL_PATH = 'trained_model.npz'
+LEGACY_MODEL_PATH = 'trained_model.json'
+
+def default_model_path() -> str:
+    """
+    Return the default model file, falling back to an existing legacy
+    trained_model.json while no trained_model.npz has been written yet.
+    The built-in model cannot write .npz files, so it always uses the JSON file.
+    """
+    if SimpleLanguageModel.__name__ == 'SimpleLanguageModelBuiltin':
+        return LEGACY_MODEL_PATH
+    if not os.path.exists(DEFAULT_MODEL_PATH) and os.path.exists(LEGACY_MODEL_PATH):
+        logger.info(f"{DEFAULT_MODEL_PATH} not found, using {LEGACY_MODEL_PATH}")
+        return LEGACY_MODEL_PATH
+    return DEFAULT_MODEL_PATH
+
+# Patterns used on every chat turn, compiled once at import
+_QUOTED_RE = re.compile(r'"([^"]+)"|\'([^\']+)\'')
+_CONTINUE_RE = re.compile(r'(?:continue|complete|finish) this:?\s*(.+?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+_PROMPT_RE = re.compile(r'(?:about|generate):?\s*(.+?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Intent rules in priority order: (type, trigger phrases, [(phrases, action), ...], default action)
+_INTENT_RULES = (
+    ('writing_assistance', ('write', 'continue', 'help me write', 'complete'),
+     ((('continue', 'complete'), 'continue_text'),
+      (('character',), 'character_development'),
+      (('plot',), 'plot_development'),
+      (('dialogue',), 'dialogue_writing')),
+     'general_writing'),
+    ('generation', ('generate', 'create', 'start'),
+     ((('story', 'tale'), 'story_generation'),
+      (('chapter',), 'chapter_generation'),
+      (('paragraph',), 'paragraph_generation')),
+     'text_generation'),
+    ('style_analysis', ('style', 'genre', 'like', 'similar to'), (), 'analyze_style'),
+    ('suggestions', ('suggest', 'idea', 'what should', 'help with'),
+     ((('character',), 'character_suggestions'),
+      (('plot',), 'plot_suggestions'),
+      (('title',), 'title_suggestions')),
+     'general_suggestions'),
+    ('info', ('status', 'trained', 'model', 'info'), (), 'model_status'),
+)
+
+_INTENT_KEYWORDS = frozenset(
+    phrase
+    for _, triggers, actions, _ in _INTENT_RULES
+    for phrase in triggers + tuple(p for phrases, _ in actions for p in phrases)
+)
+
+if ahocorasick is not None:
+    # One automaton finds every keyword in a single pass over the input
+    _INTENT_AUTOMATON = ahocorasick.Automaton()
+    for _phrase in _INTENT_KEYWORDS:
+        _INTENT_AUTOMATON.add_word(_phrase, _phrase)
+    _INTENT_AUTOMATON.make_automaton()
+else:
+    _INTENT_AUTOMATON = None
+
+@lru_cache(maxsize=1024)
+def _resolve_intent(hits: frozenset) -> Tuple[str, Optional[str]]:
+    """Map a set of keyword hits to (intent type, action) using the first rule it triggers."""
+    for intent_type, triggers, actions, default_action in _INTENT_RULES:
+        if not hits.isdisjoint(triggers):
+            return intent_type, next((action for phrases, action in actions
+                                      if not hits.isdisjoint(phrases)), default_action)
+    return 'general', None
+
+def _jsonl_line(record: Dict) -> bytes:
+    """Serialize one conversation turn as a JSON Lines record."""
+    if orjson is not None:
+        return orjson.dumps(record) + b'\n'
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _find_intent_keywords(text: str) -> frozenset:
+    """Return the intent keywords that occur anywhere in text."""
+    if _INTENT_AUTOMATON is not None:
+        return frozenset(phrase for _, phrase in _INTENT_AUTOMATON.iter(text))
+    return frozenset(phrase for phrase in _INTENT_KEYWORDS if phrase in text)
+
 class BookWritingChatbot:
     """
     AI Chatbot specialized for book writing assistance.
     Learns from provided book text databases and helps with writing tasks.
     """
     
-    def __init__(self, model_path: Optional[str] = None, n_gram_size: int = 3):
+    def __init__(self, model_path: Optional[Union[str, Path]] = None, n_gram_size: int = 3,
+                 history_cap: Optional[int] = DEFAULT_HISTORY_CAP, autosave_path: Optional[str] = None):
         self.text_processor = TextProcessor()
         self.model = SimpleLanguageModel(n_gram_size=n_gram_size)
-        self.conversation_history = []
+        # Only the most recent history_cap turns are kept (None keeps everything);
+        # with autosave_path set, every turn is also appended there as JSON Lines
+        self.conversation_history = deque(maxlen=history_cap)
+        self.autosave_path = autosave_path
         self.writing_context = {
             'current_genre': None,
             'current_style': None,
@@ -28,34 +137,46 @@ class BookWritingChatbot:
             'plot_points': [],
             'writing_goal': None
         }
+        # Set whenever the model or training data changes so callers can
+        # refresh any statistics they cache
+        self._stats_dirty = True
         
-        # Load existing model if provided
-        if model_path and os.path.exists(model_path):
+        # Load existing model if provided; a missing file just means a fresh model
+        self.loaded_model_path = None
+        if model_path and Path(model_path).is_file():
             try:
-                self.model.load_model(model_path)
+                self.model.load_model(str(model_path))
+                self.loaded_model_path = str(model_path)
                 logger.info("Loaded existing model")
             except Exception as e:
                 logger.error(f"Failed to load model: {str(e)}")
     
-    def train_from_books(self, books_directory: str, save_model_path: Optional[str] = None) -> Dict:
+    def train_from_books(self, books_directory: str, save_model_path: Optional[str] = None,
+                         progress_callback: Optional[Callable[[int, str], None]] = None) -> Dict:
         """
         Train the chatbot on books from a directory.
         
         Args:
             books_directory: Path to directory containing .txt book files
             save_model_path: Optional path to save the trained model
+            progress_callback: Optional callable receiving (percent, message) as training advances
             
         Returns:
             Training statistics
         """
         logger.info(f"Training chatbot from books in: {books_directory}")
         
+        def report(progress: int, message: str) -> None:
+            if progress_callback:
+                progress_callback(progress, message)
+        
         # Check if directory exists, create sample books if not
         if not os.path.exists(books_directory) or not os.listdir(books_directory):
             logger.warning(f"Directory {books_directory} is empty or doesn't exist. Creating sample books...")
             books_directory = self.text_processor.create_sample_books(books_directory)
         
         # Load and process books
+        report(10, "Loading books...")
         books_data = self.text_processor.load_books_from_directory(books_directory)
         
         if not books_data:
@@ -68,10 +189,12 @@ class BookWritingChatbot:
             raise ValueError("No training sentences extracted from books")
         
         # Train the model
+        report(40, f"Training model on {len(training_sentences)} sentences...")
         self.model.train(training_sentences)
         
         # Save model if path provided
         if save_model_path:
+            report(90, "Saving model...")
             self.model.save_model(save_model_path)
         
         # Get and return statistics
@@ -84,6 +207,7 @@ class BookWritingChatbot:
             'training_completed': True,
             'training_time': datetime.now().isoformat()
         }
+        self._stats_dirty = True
         
         logger.info("Training completed successfully")
         return combined_stats
@@ -111,71 +235,52 @@ class BookWritingChatbot:
         
         # Update conversation history with response
         self.conversation_history[-1]['bot'] = response
+        self._autosave([self.conversation_history[-1]])
         
         return response
     
-    def _parse_user_intent(self, user_input: str) -> Dict:
-        """Parse user input to understand their intent."""
-        user_lower = user_input.lower()
-        
-        intent = {
-            'type': 'general',
-            'action': None,
-            'parameters': {}
-        }
-        
-        # Writing assistance requests
-        if any(phrase in user_lower for phrase in ['write', 'continue', 'help me write', 'complete']):
-            intent['type'] = 'writing_assistance'
-            
-            if 'continue' in user_lower or 'complete' in user_lower:
-                intent['action'] = 'continue_text'
-            elif 'character' in user_lower:
-                intent['action'] = 'character_development'
-            elif 'plot' in user_lower:
-                intent['action'] = 'plot_development'
-            elif 'dialogue' in user_lower:
-                intent['action'] = 'dialogue_writing'
-            else:
-                intent['action'] = 'general_writing'
-        
-        # Text generation requests
-        elif any(phrase in user_lower for phrase in ['generate', 'create', 'start']):
-            intent['type'] = 'generation'
-            
-            if 'story' in user_lower or 'tale' in user_lower:
-                intent['action'] = 'story_generation'
-            elif 'chapter' in user_lower:
-                intent['action'] = 'chapter_generation'
-            elif 'paragraph' in user_lower:
-                intent['action'] = 'paragraph_generation'
-            else:
-                intent['action'] = 'text_generation'
+    def record_turn(self, user_input: str, response: str) -> None:
+        """
+        Add a turn answered outside chat(), e.g. from a reply cache, to the
+        history and the autosave file.
+        """
+        record = {'timestamp': datetime.now().isoformat(), 'user': user_input, 'bot': response}
+        self.conversation_history.append(record)
+        self._autosave([record])
+    
+    def chat_many(self, user_inputs: List[str]) -> List[str]:
+        """
+        Answer several messages in one call, in order.
         
-        # Style and genre analysis
-        elif any(phrase in user_lower for phrase in ['style', 'genre', 'like', 'similar to']):
-            intent['type'] = 'style_analysis'
-            intent['action'] = 'analyze_style'
+        All intents are parsed up front and the history is extended once at
+        the end, with a single timestamp for the whole batch.
         
-        # Suggestions and ideas
-        elif any(phrase in user_lower for phrase in ['suggest', 'idea', 'what should', 'help with']):
-            intent['type'] = 'suggestions'
+        Args:
+            user_inputs: User messages
             
-            if 'character' in user_lower:
-                intent['action'] = 'character_suggestions'
-            elif 'plot' in user_lower:
-                intent['action'] = 'plot_suggestions'
-            elif 'title' in user_lower:
-                intent['action'] = 'title_suggestions'
-            else:
-                intent['action'] = 'general_suggestions'
+        Returns:
+            Chatbot responses, one per message
+        """
+        intents = [self._parse_user_intent(user_input) for user_input in user_inputs]
+        responses = [self._generate_response(user_input, intent)
+                     for user_input, intent in zip(user_inputs, intents)]
         
-        # Model status and information
-        elif any(phrase in user_lower for phrase in ['status', 'trained', 'model', 'info']):
-            intent['type'] = 'info'
-            intent['action'] = 'model_status'
+        timestamp = datetime.now().isoformat()
+        records = [{'timestamp': timestamp, 'user': user_input, 'bot': response}
+                   for user_input, response in zip(user_inputs, responses)]
+        self.conversation_history.extend(records)
+        self._autosave(records)
         
-        return intent
+        return responses
+    
+    def _parse_user_intent(self, user_input: str) -> Dict:
+        """Parse user input to understand their intent."""
+        intent_type, action = _resolve_intent(_find_intent_keywords(user_input.lower()))
+        return {
+            'type': intent_type,
+            'action': action,
+            'parameters': {}
+        }
     
     def _generate_response(self, user_input: str, intent: Dict) -> str:
         """Generate appropriate response based on user intent."""
@@ -317,12 +422,12 @@ class BookWritingChatbot:
     
     def _handle_general_chat(self, user_input: str) -> str:
         """Handle general conversation."""
-        # Try to generate relevant text based on keywords in input
-        keywords = re.findall(r'\b\w+\b', user_input.lower())
-        relevant_keywords = [word for word in keywords if word in self.model.vocabulary]
+        # Try to generate relevant text based on the first keyword in the
+        # model's vocabulary; the scan stops as soon as one is found
+        vocabulary = self.model.vocabulary
+        prompt = next((word for word in _WORD_RE.findall(user_input.lower()) if word in vocabulary), None)
         
-        if relevant_keywords:
-            prompt = relevant_keywords[0]
+        if prompt is not None:
             response = self.model.generate_text(prompt, max_length=30)
             return f"Based on your message, here's something from my training:\n\n{response}"
         else:
@@ -332,46 +437,32 @@ class BookWritingChatbot:
     def _extract_text_to_continue(self, user_input: str) -> str:
         """Extract text that the user wants to continue."""
         # Look for quoted text or text after "continue this:"
-        patterns = [
-            r'"([^"]+)"',
-            r"'([^']+)'",
-            r'continue this:?\s*(.+?)(?:\n|$)',
-            r'complete this:?\s*(.+?)(?:\n|$)',
-            r'finish this:?\s*(.+?)(?:\n|$)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE | re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
+        return self._extract_quoted_or(_CONTINUE_RE, user_input)
     
     def _extract_prompt(self, user_input: str) -> str:
         """Extract writing prompt from user input."""
         # Look for quoted text or text after keywords
-        patterns = [
-            r'"([^"]+)"',
-            r"'([^']+)'",
-            r'about:?\s*(.+?)(?:\n|$)',
-            r'write about:?\s*(.+?)(?:\n|$)',
-            r'generate:?\s*(.+?)(?:\n|$)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE | re.DOTALL)
-            if match:
-                return match.group(1).strip()
+        return self._extract_quoted_or(_PROMPT_RE, user_input)
+    
+    def _extract_quoted_or(self, pattern: re.Pattern, user_input: str) -> str:
+        """Return the first quoted string in user_input, else pattern's capture."""
+        match = _QUOTED_RE.search(user_input)
+        if match:
+            return (match.group(1) or match.group(2)).strip()
+        
+        match = pattern.search(user_input)
+        if match:
+            return match.group(1).strip()
         
         return ""
     
-    def get_conversation_history(self) -> List[Dict]:
+    def get_conversation_history(self) -> Deque[Dict]:
         """Get the conversation history."""
         return self.conversation_history
     
     def clear_conversation_history(self) -> None:
         """Clear the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         logger.info("Conversation history cleared")
     
     def get_next_word_suggestions(self, text: str, num_suggestions: int = 5) -> List[Tuple[str, float]]:
@@ -379,11 +470,59 @@ class BookWritingChatbot:
         return self.model.suggest_next_words(text, num_suggestions)
     
     def save_conversation(self, filepath: str) -> None:
-        """Save conversation history to a file."""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.conversation_history, f, indent=2, ensure_ascii=False)
+        """
+        Save conversation history to a JSON Lines file, one turn per line.
+        
+        Args:
+            filepath: Path of the file to write
+        """
+        self._write_atomic(filepath, map(_jsonl_line, self.conversation_history))
         logger.info(f"Conversation saved to {filepath}")
     
+    def export_conversation_json(self, filepath: str, compact: bool = False) -> None:
+        """
+        Export conversation history as a single JSON array.
+        
+        Args:
+            filepath: Path of the JSON file to write
+            compact: Write minified JSON (with orjson when installed) instead of indented JSON
+        """
+        history = list(self.conversation_history)
+        if compact and orjson is not None:
+            data = orjson.dumps(history)
+        elif compact:
+            data = json.dumps(history, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        else:
+            data = json.dumps(history, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        self._write_atomic(filepath, [data])
+        logger.info(f"Conversation exported to {filepath}")
+    
+    def _autosave(self, records: List[Dict]) -> None:
+        """Append finished turns to the autosave file, if one is set."""
+        if not self.autosave_path:
+            return
+        try:
+            with open(self.autosave_path, 'ab') as f:
+                f.writelines(map(_jsonl_line, records))
+        except OSError as e:
+            logger.error(f"Failed to autosave conversation: {str(e)}")
+    
+    def _write_atomic(self, filepath: str, chunks: Iterable[bytes]) -> None:
+        """
+        Write chunks to a temporary file next to the target and rename it into
+        place, so an interrupted save never leaves a truncated file behind.
+        """
+        directory = os.path.dirname(os.path.abspath(filepath))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False) as tmp:
+            try:
+                tmp.writelines(chunks)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, filepath)
+    
     def export_model_info(self) -> Dict:
         """Export comprehensive information about the model and training data."""
         text_stats = self.text_processor.get_statistics()
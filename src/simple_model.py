@@ -1,32 +1,219 @@
+import ast
+from array import array
 import json
+import os
 import pickle
 import random
 import re
-from collections import defaultdict, Counter
-from typing import List, Dict, Tuple, Optional
+import struct
+import tempfile
+import zipfile
+from collections import Counter, OrderedDict
+from typing import Iterable, List, Dict, Tuple, Optional
 import logging
 import numpy as np
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_MASK64 = (1 << 64) - 1
+
+# Word runs and sentence-ending punctuation, the only tokens the models keep
+_TOKEN_RE = re.compile(r'\w+|[.!?]')
+
+# Temperature-scaled CDFs kept per model, keyed by (context row, temperature)
+_CDF_CACHE_SIZE = 16384
+
+# Bumped whenever the arrays stored in .npz model files change
+# (version 1 stored float32 probabilities)
+NPZ_FORMAT_VERSION = 2
+
+# Attributes decoded on first access after loading an .npz model
+_VOCABULARY_ATTRS = frozenset({'word_to_id', 'id_to_word', 'vocabulary', 'word_counts'})
+
+# Probabilities are stored as uint16 fixed point: p is kept as round(p * _PROB_SCALE)
+_PROB_SCALE = 65535
+
+def _pack_strings(strings: List[str]) -> np.ndarray:
+    """Encode strings as one newline-delimited UTF-8 byte array."""
+    return np.frombuffer('\n'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+def _unpack_strings(blob: np.ndarray) -> List[str]:
+    """Inverse of _pack_strings."""
+    text = blob.tobytes().decode('utf-8')
+    return text.split('\n') if text else []
+
+def _load_npz_arrays(filepath: str) -> Dict[str, np.ndarray]:
+    """
+    Load every array of an .npz archive, memory-mapping the uncompressed
+    members (np.savez never compresses) straight out of the archive file, so
+    pages are only read when touched and are shared between processes.
+    """
+    arrays = {}
+    with zipfile.ZipFile(filepath) as archive, open(filepath, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            
+            # Skip the member's local file header to reach the .npy data
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack('<26xHH', f.read(30))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"Object arrays are not allowed in model files: {name}")
+            
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(f, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C')
+    return arrays
+
+def _quantize_probs(probs: np.ndarray) -> np.ndarray:
+    """
+    Convert probabilities to uint16 fixed point. Every stored pair was seen in
+    training, so no weight is rounded all the way down to zero.
+    """
+    return np.maximum(np.rint(np.asarray(probs, dtype=np.float64) * _PROB_SCALE), 1).astype(np.uint16)
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _count_ngrams_kernel(flat, sentence_offsets, window_offsets, n, base, context_keys_out, next_ids_out):
+        """
+        Write the context key and next word id of every n-gram window into the
+        output buffers. Sentence s owns the slots from window_offsets[s]. The
+        key is the same wrapping base-V hash as SimpleLanguageModel._context_key.
+        
+        Deliberately serial: training runs on app/CLI worker threads, and a
+        parallel (prange) kernel launched from one leaves the threading layer
+        hanging at interpreter exit. The loop is memory-bound anyway.
+        """
+        for s in range(len(sentence_offsets) - 1):
+            out = window_offsets[s]
+            for start in range(sentence_offsets[s], sentence_offsets[s + 1] - n + 1):
+                key = np.int64(0)
+                for i in range(start, start + n - 1):
+                    key = key * base + flat[i]
+                context_keys_out[out] = key
+                next_ids_out[out] = flat[start + n - 1]
+                out += 1
+    
+    @njit(cache=True, nogil=True)
+    def _generate_kernel(history, max_length, n, base, context_keys, indptr, next_ids, probs,
+                         temperature, stop_ids, vocab_size, seed):
+        """
+        Run generate_text's sampling loop without the GIL and return the new
+        word ids. Mirrors _find_context and _sample_word: contexts are the last
+        n-1 ids, unseen contexts draw a uniform random word, and generation
+        stops after any id in stop_ids.
+        """
+        np.random.seed(seed)
+        exponent = 1.0 / temperature if temperature != 0 else 1.0
+        size = len(history)
+        ids = np.empty(size + max_length, dtype=np.int32)
+        ids[:size] = history
+        
+        for _ in range(max_length):
+            row = -1
+            if size >= n - 1 and len(context_keys) > 0:
+                key = np.int64(0)
+                for i in range(size - (n - 1), size):
+                    key = key * base + ids[i]
+                row = np.searchsorted(context_keys, key)
+                if row >= len(context_keys) or context_keys[row] != key:
+                    row = -1
+            
+            if row < 0:
+                next_id = np.random.randint(0, vocab_size)
+            else:
+                start, end = indptr[row], indptr[row + 1]
+                pick = start
+                if temperature == 0:
+                    for j in range(start + 1, end):
+                        if probs[j] > probs[pick]:
+                            pick = j
+                elif temperature == 1.0:
+                    # Unscaled weights: draw directly, without the pow and CDF
+                    # allocation below (generate_text defaults to 0.8, which
+                    # takes the rescaling branch)
+                    total = 0.0
+                    for j in range(start, end):
+                        total += probs[j]
+                    target = np.random.random() * total
+                    pick = end - 1
+                    for j in range(start, end):
+                        target -= probs[j]
+                        if target < 0:
+                            pick = j
+                            break
+                else:
+                    # Rescale each weight once, then invert the CDF by bisection.
+                    # Weights are divided by the row maximum first: raw uint16
+                    # weights raised to 1/temperature overflow at low temperatures
+                    weights = probs[start:end].astype(np.float64)
+                    cdf = np.cumsum((weights / weights.max()) ** exponent)
+                    offset = np.searchsorted(cdf, np.random.random() * cdf[-1], side='right')
+                    pick = start + min(offset, end - start - 1)
+                next_id = next_ids[pick]
+            
+            ids[size] = next_id
+            size += 1
+            
+            stop = False
+            for stop_id in stop_ids:
+                if next_id == stop_id:
+                    stop = True
+            if stop:
+                break
+        
+        return ids[len(history):size]
+else:
+    _count_ngrams_kernel = None
+    _generate_kernel = None
+
 class SimpleLanguageModel:
     """
     A simple n-gram based language model that learns from text data.
     Uses statistical patterns rather than neural networks to be "dumb" without training data.
+    
+    N-grams are stored as a CSR table over word ids: context_keys holds the
+    sorted context hashes, and the next words seen after context c are
+    next_ids[indptr[c]:indptr[c + 1]] with probabilities probs[indptr[c]:indptr[c + 1]].
+    Probabilities are uint16 fixed point (see _PROB_SCALE); sampling only needs
+    them up to a per-row scale, so they are used as integer weights.
     """
     
     def __init__(self, n_gram_size: int = 3, min_word_count: int = 2):
         self.n_gram_size = n_gram_size
         self.min_word_count = min_word_count
         self.word_to_id = {}
-        self.id_to_word = {}
+        self.id_to_word = []
         self.vocabulary = set()
         self.word_counts = Counter()
-        self.n_grams = defaultdict(lambda: defaultdict(int))
-        self.sentence_starters = []
+        self._pending_vocabulary = None
+        self._set_sentence_starters([])
         self.is_trained = False
+        self._clear_ngram_table()
+        self._rng = np.random.default_rng()
         
         # Basic grammar rules (the "non-dumb" part when no training data)
         self.basic_grammar = {
@@ -37,80 +224,200 @@ class SimpleLanguageModel:
             'prepositions': ['in', 'on', 'at', 'by', 'for', 'with', 'to', 'from', 'about', 'over', 'under']
         }
     
-    def train(self, sentences: List[str]) -> None:
+    def __getattr__(self, name: str):
+        # Only reached for missing attributes: the vocabulary of a freshly
+        # loaded .npz model is decoded the first time any part of it is used
+        pending = self.__dict__.get('_pending_vocabulary')
+        if name in _VOCABULARY_ATTRS and pending is not None:
+            self._decode_vocabulary(*pending)
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def train(self, sentences: Iterable[str]) -> None:
         """
         Train the model on a list of sentences.
         
+        Sentences are consumed in a single streaming pass, so any iterable
+        (including a generator over a large corpus) works.
+        
         Args:
-            sentences: List of sentences to train on
+            sentences: Sentences to train on
         """
-        if not sentences:
-            logger.warning("No sentences provided for training")
-            return
-            
-        logger.info(f"Training on {len(sentences)} sentences...")
-        
-        # Preprocess and build vocabulary
-        processed_sentences = []
+        # Stream sentences into one flat int32 token buffer; ids are assigned
+        # in order of first appearance and remapped once the vocabulary is known
+        first_ids = {}
+        tokens = array('i')
+        lengths = array('q')
+        sentence_starters = []
+        num_sentences = 0
         for sentence in sentences:
+            num_sentences += 1
             words = self._preprocess_sentence(sentence)
             if len(words) >= self.n_gram_size:
-                processed_sentences.append(words)
-                
                 # Track sentence starters
                 if words[0].istitle():
-                    self.sentence_starters.append(words[0])
+                    sentence_starters.append(words[0])
                 
-                # Update word counts
-                for word in words:
-                    self.word_counts[word] += 1
+                tokens.extend([first_ids.setdefault(word, len(first_ids)) for word in words])
+                lengths.append(len(words))
         
-        # Filter vocabulary by minimum count
-        self.vocabulary = {word for word, count in self.word_counts.items() 
-                          if count >= self.min_word_count}
+        if not num_sentences:
+            logger.warning("No sentences provided for training")
+            return
+            
+        logger.info(f"Training on {num_sentences} sentences ({len(tokens)} tokens)...")
         
-        # Create word mappings
-        self.word_to_id = {word: i for i, word in enumerate(sorted(self.vocabulary))}
-        self.id_to_word = {i: word for word, i in self.word_to_id.items()}
+        # Each call trains from scratch on the sentences given
+        self._pending_vocabulary = None
+        words_seen = list(first_ids)
+        tokens = np.frombuffer(tokens, dtype=np.int32)
+        lengths = np.frombuffer(lengths, dtype=np.int64)
+        counts = np.bincount(tokens, minlength=len(words_seen))
+        self.word_counts = Counter(dict(zip(words_seen, counts.tolist())))
+        self._set_sentence_starters(sentence_starters)
         
-        # Build n-grams
-        for sentence in processed_sentences:
-            # Filter sentence to only include vocabulary words
-            filtered_sentence = [word for word in sentence if word in self.vocabulary]
-            
-            if len(filtered_sentence) >= self.n_gram_size:
-                for i in range(len(filtered_sentence) - self.n_gram_size + 1):
-                    n_gram = tuple(filtered_sentence[i:i + self.n_gram_size - 1])
-                    next_word = filtered_sentence[i + self.n_gram_size - 1]
-                    self.n_grams[n_gram][next_word] += 1
-        
-        # Convert counts to probabilities
-        for n_gram in self.n_grams:
-            total_count = sum(self.n_grams[n_gram].values())
-            for word in self.n_grams[n_gram]:
-                self.n_grams[n_gram][word] /= total_count
+        # Filter vocabulary by minimum count
+        kept = sorted(np.flatnonzero(counts >= self.min_word_count).tolist(),
+                      key=words_seen.__getitem__)
+        self.vocabulary = {words_seen[i] for i in kept}
+        
+        # Create word mappings; ids index straight into the sorted word list
+        self.id_to_word = [words_seen[i] for i in kept]
+        self.word_to_id = {word: new_id for new_id, word in enumerate(self.id_to_word)}
+        
+        # Remap tokens to vocabulary ids, dropping out-of-vocabulary words
+        remap = np.full(len(words_seen), -1, dtype=np.int32)
+        remap[kept] = np.arange(len(kept), dtype=np.int32)
+        tokens = remap[tokens]
+        in_vocab = tokens >= 0
+        sentence_index = np.repeat(np.arange(len(lengths)), lengths)
+        lengths = np.bincount(sentence_index[in_vocab], minlength=len(lengths))
+        tokens = tokens[in_vocab]
+        
+        # Build the n-gram table from every (context, next word) window
+        self._clear_ngram_table()
+        context_keys, next_ids = self._count_ngrams(tokens, lengths)
+        self._set_ngram_table(context_keys, next_ids)
         
         self.is_trained = True
         logger.info(f"Training completed. Vocabulary size: {len(self.vocabulary)}, "
-                   f"N-grams: {len(self.n_grams)}")
+                   f"N-grams: {len(self.context_keys)}")
+    
+    def _set_sentence_starters(self, starters: List[str]) -> None:
+        """Set sentence_starters along with the distinct starters sampled from."""
+        self.sentence_starters = starters
+        self._starter_pool = tuple(set(starters))
+    
+    def _clear_ngram_table(self) -> None:
+        """Reset the n-gram table to empty."""
+        self._hash_base = max(len(self.word_to_id), 1)
+        self.context_keys = np.empty(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.next_ids = np.empty(0, dtype=np.int32)
+        self.probs = np.empty(0, dtype=np.uint16)
+        self._context_rows = None
+        self._cdf_cache = OrderedDict()
+    
+    def _context_key(self, ids: List[int]) -> int:
+        """
+        Hash a context of word ids to a signed 64-bit key.
+        
+        This is the context read as a base-V number (V = vocabulary size),
+        wrapped to 64 bits exactly like the vectorized _context_keys.
+        """
+        key = 0
+        for word_id in ids:
+            key = (key * self._hash_base + word_id) & _MASK64
+        return key - (1 << 64) if key >= (1 << 63) else key
+    
+    def _context_keys(self, contexts: np.ndarray) -> np.ndarray:
+        """Vectorized _context_key over the rows of a 2-D array of word ids."""
+        keys = np.zeros(len(contexts), dtype=np.int64)
+        for column in range(contexts.shape[1]):
+            keys = keys * self._hash_base + contexts[:, column]
+        return keys
+    
+    def _count_ngrams(self, flat: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the context key and next word id of every n-gram window.
+        
+        Args:
+            flat: Word ids of all sentences back to back
+            lengths: Number of ids in each sentence; windows never cross sentences
+        """
+        n = self.n_gram_size
+        if len(flat) < n:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        
+        if _count_ngrams_kernel is not None:
+            sentence_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=sentence_offsets[1:])
+            window_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(np.maximum(lengths - n + 1, 0), out=window_offsets[1:])
+            context_keys = np.empty(window_offsets[-1], dtype=np.int64)
+            next_ids = np.empty(window_offsets[-1], dtype=np.int32)
+            _count_ngrams_kernel(flat, sentence_offsets, window_offsets, n, self._hash_base,
+                                 context_keys, next_ids)
+            return context_keys, next_ids
+        
+        # A window may start at position p only if it ends inside p's sentence
+        num_windows = len(flat) - n + 1
+        sentence_ends = np.repeat(np.cumsum(lengths), lengths)[:num_windows]
+        valid = np.arange(num_windows) + n <= sentence_ends
+        
+        windows = np.lib.stride_tricks.sliding_window_view(flat, n)[valid]
+        return self._context_keys(windows[:, :-1]), windows[:, -1]
+    
+    def _set_ngram_table(self, context_keys: np.ndarray, next_ids: np.ndarray,
+                         weights: Optional[np.ndarray] = None) -> None:
+        """
+        Aggregate (context key, next word id) pairs into the CSR n-gram table.
+        
+        Args:
+            context_keys: Context key of each pair
+            next_ids: Next word id of each pair
+            weights: Optional weight of each pair (defaults to a count of 1)
+        """
+        if len(context_keys) == 0:
+            self._clear_ngram_table()
+            return
+        
+        base = self._hash_base
+        self._context_rows = None
+        self._cdf_cache.clear()
+        self.context_keys, context_index = np.unique(context_keys, return_inverse=True)
+        pair_keys, pair_index = np.unique(context_index.astype(np.int64) * base + next_ids,
+                                          return_inverse=True)
+        pair_counts = np.bincount(pair_index, weights=weights)
+        
+        self.next_ids = (pair_keys % base).astype(np.int32)
+        self.indptr = np.zeros(len(self.context_keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_keys // base, minlength=len(self.context_keys)),
+                  out=self.indptr[1:])
+        
+        # Normalize each context's counts into probabilities
+        context_totals = np.add.reduceat(pair_counts, self.indptr[:-1])
+        self.probs = _quantize_probs(pair_counts / np.repeat(context_totals, np.diff(self.indptr)))
+    
+    def _find_context(self, ids: List[int]) -> int:
+        """
+        Return the table row for a context of word ids, or -1 if unseen.
+        Only contexts of exactly n-1 words were recorded during training.
+        """
+        if len(ids) != self.n_gram_size - 1:
+            return -1
+        
+        # Map context keys to rows once per table; a dict probe is far cheaper
+        # per token than a searchsorted call on a NumPy array
+        if self._context_rows is None:
+            self._context_rows = dict(zip(self.context_keys.tolist(), range(len(self.context_keys))))
+        return self._context_rows.get(self._context_key(ids), -1)
     
     def _preprocess_sentence(self, sentence: str) -> List[str]:
         """Preprocess a sentence into a list of words."""
-        # Basic cleaning
-        sentence = sentence.strip()
-        
-        # Split into words and punctuation
-        tokens = re.findall(r'\b\w+\b|[.!?;,]', sentence)
-        
-        # Filter out very short tokens and normalize
-        words = []
-        for token in tokens:
-            if token.isalpha() and len(token) > 1:
-                words.append(token.lower())
-            elif token in '.!?':
-                words.append(token)
-                
-        return words
+        # Keep alphabetic words of two or more letters and .!? in one pass
+        return [token for token in _TOKEN_RE.findall(sentence.lower())
+                if (len(token) > 1 and token.isalpha()) or token in '.!?']
     
     def generate_text(self, prompt: str = "", max_length: int = 100, temperature: float = 0.8) -> str:
         """
@@ -134,38 +441,39 @@ class SimpleLanguageModel:
             words = [word for word in words if word in self.vocabulary]
         else:
             # Start with a random sentence starter
-            if self.sentence_starters:
-                starter = random.choice(list(set(self.sentence_starters)))
+            if self._starter_pool:
+                starter = random.choice(self._starter_pool)
                 words = [starter.lower()]
             else:
-                words = [random.choice(list(self.vocabulary))]
+                words = [self.id_to_word[random.randrange(len(self.id_to_word))]]
         
         generated_words = words.copy()
+        generated_ids = [self.word_to_id[word] for word in words]
+        context_size = self.n_gram_size - 1
+        
+        if _generate_kernel is not None:
+            stop_ids = [self.word_to_id[p] for p in '.!?' if p in self.word_to_id]
+            new_ids = _generate_kernel(
+                np.array(generated_ids, dtype=np.int32), max_length, self.n_gram_size, self._hash_base,
+                np.asarray(self.context_keys), np.asarray(self.indptr), np.asarray(self.next_ids),
+                np.asarray(self.probs), float(temperature), np.array(stop_ids, dtype=np.int32),
+                len(self.id_to_word), int(self._rng.integers(2 ** 31))
+            )
+            generated_words.extend(self.id_to_word[i] for i in new_ids.tolist())
+            return self._format_output(generated_words)
         
         for _ in range(max_length):
-            # Get the current context (last n-1 words)
-            if len(generated_words) >= self.n_gram_size - 1:
-                context = tuple(generated_words[-(self.n_gram_size - 1):])
-            else:
-                context = tuple(generated_words)
-            
-            # Find possible next words
-            next_word_probs = self.n_grams.get(context, {})
+            # Get the current context (last n-1 words) and its table row
+            row = self._find_context(generated_ids[-context_size:] if context_size else [])
             
-            if not next_word_probs:
-                # Fallback to shorter context or random word
-                if len(context) > 1:
-                    context = context[1:]
-                    next_word_probs = self.n_grams.get(context, {})
-                
-                if not next_word_probs:
-                    # Pick a random word from vocabulary
-                    next_word = random.choice(list(self.vocabulary))
-                else:
-                    next_word = self._sample_word(next_word_probs, temperature)
+            if row < 0:
+                # Unseen context: pick a random word from vocabulary
+                next_id = random.randrange(len(self.id_to_word))
             else:
-                next_word = self._sample_word(next_word_probs, temperature)
+                next_id = self._sample_word(row, temperature)
             
+            next_word = self.id_to_word[next_id]
+            generated_ids.append(next_id)
             generated_words.append(next_word)
             
             # Stop if we hit a sentence ending
@@ -175,22 +483,44 @@ class SimpleLanguageModel:
         # Convert to readable text
         return self._format_output(generated_words)
     
-    def _sample_word(self, word_probs: Dict[str, float], temperature: float) -> str:
-        """Sample a word based on probabilities and temperature."""
-        words = list(word_probs.keys())
-        probs = list(word_probs.values())
+    def _sample_word(self, ctx_id: int, temperature: float) -> int:
+        """Sample a next word id for a context row based on probabilities and temperature."""
+        start, end = self.indptr[ctx_id], self.indptr[ctx_id + 1]
+        probs = self.probs[start:end]
         
         if temperature == 0:
             # Greedy selection
-            return words[np.argmax(probs)]
-        
-        # Apply temperature
-        probs = np.array(probs)
-        probs = np.power(probs, 1.0 / temperature)
-        probs = probs / np.sum(probs)
-        
-        # Sample
-        return np.random.choice(words, p=probs)
+            return int(self.next_ids[start + np.argmax(probs)])
+        
+        # Reuse the temperature-scaled CDF of recently sampled contexts
+        key = (ctx_id, temperature)
+        cdf = self._cdf_cache.get(key)
+        if cdf is None:
+            if temperature != 1.0:
+                # Scale to the row maximum so low temperatures cannot overflow to inf
+                cdf = np.cumsum((probs / np.float32(probs.max())) ** np.float32(1.0 / temperature))
+            else:
+                cdf = np.cumsum(probs, dtype=np.int64)
+            self._cdf_cache[key] = cdf
+            if len(self._cdf_cache) > _CDF_CACHE_SIZE:
+                try:
+                    self._cdf_cache.popitem(last=False)
+                except KeyError:
+                    pass  # Another thread emptied the cache first
+        else:
+            try:
+                self._cdf_cache.move_to_end(key)
+            except KeyError:
+                pass  # Evicted by another thread in the meantime
+        
+        # Invert the unnormalized CDF with a binary search, staying in the
+        # integer domain when the weights were not rescaled
+        if cdf.dtype.kind == 'i':
+            target = self._rng.integers(cdf[-1])
+        else:
+            target = self._rng.random() * cdf[-1]
+        idx = int(np.searchsorted(cdf, target, side='right'))
+        return int(self.next_ids[start + min(idx, end - start - 1)])
     
     def _format_output(self, words: List[str]) -> str:
         """Format a list of words into readable text."""
@@ -255,24 +585,56 @@ class SimpleLanguageModel:
         words = self._preprocess_sentence(context)
         words = [word for word in words if word in self.vocabulary]
         
-        if len(words) >= self.n_gram_size - 1:
-            context_tuple = tuple(words[-(self.n_gram_size - 1):])
-        else:
-            context_tuple = tuple(words)
+        context_size = self.n_gram_size - 1
+        ids = [self.word_to_id[word] for word in words]
+        row = self._find_context(ids[-context_size:] if context_size else [])
+        if row < 0:
+            return []
+        
+        # Select the top suggestions with a partial sort, then order just those
+        # by probability; ties keep table order, also at the cut-off
+        start, end = self.indptr[row], self.indptr[row + 1]
+        weights = self.probs[start:end].astype(np.int64)
+        total = weights.sum()
+        k = min(num_suggestions, len(weights))
+        if k <= 0:
+            return []
+        kth_largest = -np.partition(-weights, k - 1)[k - 1]
+        above = np.flatnonzero(weights > kth_largest)
+        tied = np.flatnonzero(weights == kth_largest)[:k - len(above)]
+        top = np.concatenate((above, tied))
+        order = top[np.lexsort((top, -weights[top]))]
+        return [(self.id_to_word[int(self.next_ids[start + i])], float(weights[i] / total)) for i in order]
+    
+    def suggest_next_words_batch(self, contexts: List[str], num_suggestions: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Suggest next words for several contexts at once.
         
-        next_word_probs = self.n_grams.get(context_tuple, {})
+        Args:
+            contexts: Text contexts
+            num_suggestions: Number of suggestions to return per context
+            
+        Returns:
+            One list of (word, probability) tuples per context
+        """
+        return [self.suggest_next_words(context, num_suggestions) for context in contexts]
+    
+    def save_model(self, filepath: str, compact: bool = True) -> None:
+        """
+        Save the trained model to a file.
         
-        if not next_word_probs and len(context_tuple) > 1:
-            # Try shorter context
-            context_tuple = context_tuple[1:]
-            next_word_probs = self.n_grams.get(context_tuple, {})
+        Paths ending in .npz get the binary NumPy format; anything else is
+        written as JSON.
+        
+        Args:
+            filepath: Path of the file to write
+            compact: Write minified JSON (with orjson when installed) instead of indented JSON
+        """
+        if str(filepath).endswith('.npz'):
+            self._save_npz(filepath)
+            logger.info(f"Model saved to {filepath}")
+            return
         
-        # Sort by probability and return top suggestions
-        suggestions = sorted(next_word_probs.items(), key=lambda x: x[1], reverse=True)
-        return suggestions[:num_suggestions]
-    
-    def save_model(self, filepath: str) -> None:
-        """Save the trained model to a file."""
         model_data = {
             'n_gram_size': self.n_gram_size,
             'min_word_count': self.min_word_count,
@@ -280,36 +642,88 @@ class SimpleLanguageModel:
             'id_to_word': self.id_to_word,
             'vocabulary': list(self.vocabulary),
             'word_counts': dict(self.word_counts),
-            'n_grams': {str(k): dict(v) for k, v in self.n_grams.items()},
+            'context_keys': self.context_keys.tolist(),
+            'indptr': self.indptr.tolist(),
+            'next_ids': self.next_ids.tolist(),
+            'probs': self.probs.tolist(),
             'sentence_starters': self.sentence_starters,
             'is_trained': self.is_trained
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(model_data, f, indent=2, ensure_ascii=False)
+        if compact and orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(model_data, option=orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                if compact:
+                    json.dump(model_data, f, separators=(',', ':'), ensure_ascii=False)
+                else:
+                    json.dump(model_data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Model saved to {filepath}")
     
+    def _save_npz(self, filepath: str) -> None:
+        """Write the model as an uncompressed .npz archive of flat arrays."""
+        vocabulary = self.id_to_word
+        counted_words = list(self.word_counts)
+        
+        # Write through a file object so NumPy does not append another .npz, and
+        # to a new file renamed into place: a loaded model may be memory-mapping
+        # the old one, and truncating it in place would pull pages out from under it
+        directory = os.path.dirname(os.path.abspath(filepath))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False) as f:
+            np.savez(
+                f,
+                meta=np.array([NPZ_FORMAT_VERSION, self.n_gram_size, self.min_word_count,
+                               int(self.is_trained)], dtype=np.int64),
+                vocabulary=_pack_strings(vocabulary),
+                counted_words=_pack_strings(counted_words),
+                word_counts=np.array([self.word_counts[word] for word in counted_words], dtype=np.int64),
+                sentence_starters=_pack_strings(self.sentence_starters),
+                context_keys=self.context_keys,
+                indptr=self.indptr,
+                next_ids=self.next_ids,
+                probs=self.probs
+            )
+        os.replace(f.name, filepath)
+    
     def load_model(self, filepath: str) -> None:
-        """Load a trained model from a file."""
+        """Load a trained model from a .npz or JSON file."""
         try:
+            with open(filepath, 'rb') as f:
+                is_npz = f.read(2) == b'PK'
+            
+            if is_npz:
+                self._load_npz(filepath)
+                logger.info(f"Model loaded from {filepath}")
+                return
+            
             with open(filepath, 'r', encoding='utf-8') as f:
                 model_data = json.load(f)
             
             self.n_gram_size = model_data['n_gram_size']
             self.min_word_count = model_data['min_word_count']
             self.word_to_id = model_data['word_to_id']
-            self.id_to_word = {int(k): v for k, v in model_data['id_to_word'].items()}
+            self.id_to_word = model_data['id_to_word']
+            if isinstance(self.id_to_word, dict):
+                # Older files stored the reverse map as {"id": word}
+                self.id_to_word = sorted(self.word_to_id, key=self.word_to_id.__getitem__)
             self.vocabulary = set(model_data['vocabulary'])
             self.word_counts = Counter(model_data['word_counts'])
+            self._pending_vocabulary = None
             
-            # Reconstruct n_grams
-            self.n_grams = defaultdict(lambda: defaultdict(int))
-            for k, v in model_data['n_grams'].items():
-                key = eval(k)  # Convert string back to tuple
-                self.n_grams[key] = defaultdict(int, v)
+            self._clear_ngram_table()
+            if 'n_grams' in model_data:
+                self._load_legacy_ngrams(model_data['n_grams'])
+            else:
+                self.context_keys = np.asarray(model_data['context_keys'], dtype=np.int64)
+                self.indptr = np.asarray(model_data['indptr'], dtype=np.int64)
+                self.next_ids = np.asarray(model_data['next_ids'], dtype=np.int32)
+                probs = np.asarray(model_data['probs'])
+                # Files written before quantization hold float probabilities
+                self.probs = _quantize_probs(probs) if probs.dtype.kind == 'f' else probs.astype(np.uint16)
             
-            self.sentence_starters = model_data['sentence_starters']
+            self._set_sentence_starters(model_data['sentence_starters'])
             self.is_trained = model_data['is_trained']
             
             logger.info(f"Model loaded from {filepath}")
@@ -318,13 +732,82 @@ class SimpleLanguageModel:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
-    def get_model_stats(self) -> Dict:
-        """Get statistics about the trained model."""
+    def _load_npz(self, filepath: str) -> None:
+        """
+        Read a model written by _save_npz.
+        
+        The n-gram arrays are memory-mapped rather than read, and the
+        vocabulary is only decoded when first needed (see __getattr__), so
+        loading costs little more than opening the file.
+        """
+        data = _load_npz_arrays(filepath)
+        version, n_gram_size, min_word_count, is_trained = (int(x) for x in data['meta'])
+        if version not in (1, NPZ_FORMAT_VERSION):
+            raise ValueError(f"Unsupported model format version: {version}")
+        
+        self.n_gram_size = n_gram_size
+        self.min_word_count = min_word_count
+        self._set_sentence_starters(_unpack_strings(data['sentence_starters']))
+        self._clear_ngram_table()
+        
+        for name in _VOCABULARY_ATTRS:
+            self.__dict__.pop(name, None)
+        vocabulary_blob = data['vocabulary']
+        self._pending_vocabulary = (vocabulary_blob, data['counted_words'], data['word_counts'])
+        # The context hash base is the vocabulary size, i.e. the number of packed words
+        vocabulary_size = int(np.count_nonzero(vocabulary_blob == ord('\n'))) + 1 if len(vocabulary_blob) else 0
+        self._hash_base = max(vocabulary_size, 1)
+        
+        self.context_keys = data['context_keys']
+        self.indptr = data['indptr']
+        self.next_ids = data['next_ids']
+        self.probs = data['probs'] if version == NPZ_FORMAT_VERSION else _quantize_probs(data['probs'])
+        self.is_trained = bool(is_trained)
+    
+    def _decode_vocabulary(self, vocabulary_blob: np.ndarray, counted_words_blob: np.ndarray,
+                           word_counts: np.ndarray) -> None:
+        """Build the word mappings and counts deferred by _load_npz."""
+        vocabulary = _unpack_strings(vocabulary_blob)
+        counted_words = _unpack_strings(counted_words_blob)
+        
+        self.word_to_id = {word: i for i, word in enumerate(vocabulary)}
+        self.id_to_word = vocabulary
+        self.vocabulary = set(vocabulary)
+        self.word_counts = Counter(dict(zip(counted_words, word_counts.tolist())))
+        self._pending_vocabulary = None
+    
+    def _load_legacy_ngrams(self, n_grams: Dict[str, Dict[str, float]]) -> None:
+        """Convert the old {"('w1', 'w2')": {next_word: prob}} format into the n-gram table."""
+        context_keys = []
+        next_ids = []
+        weights = []
+        for key, next_words in n_grams.items():
+            context = ast.literal_eval(key)
+            if not all(word in self.word_to_id for word in context):
+                continue
+            context_key = self._context_key([self.word_to_id[word] for word in context])
+            for word, prob in next_words.items():
+                if word in self.word_to_id:
+                    context_keys.append(context_key)
+                    next_ids.append(self.word_to_id[word])
+                    weights.append(prob)
+        
+        self._set_ngram_table(np.array(context_keys, dtype=np.int64),
+                              np.array(next_ids, dtype=np.int32),
+                              np.array(weights, dtype=np.float64))
+    
+    def get_model_stats(self, top_k: int = 10) -> Dict:
+        """
+        Get statistics about the trained model.
+        
+        Args:
+            top_k: Number of most common words to include
+        """
         return {
             'is_trained': self.is_trained,
             'vocabulary_size': len(self.vocabulary),
             'n_gram_size': self.n_gram_size,
-            'total_n_grams': len(self.n_grams),
-            'sentence_starters': len(set(self.sentence_starters)),
-            'most_common_words': self.word_counts.most_common(10) if self.word_counts else []
+            'total_n_grams': len(self.context_keys),
+            'sentence_starters': len(self._starter_pool),
+            'most_common_words': self.word_counts.most_common(top_k) if self.is_trained and self.word_counts else []
         }
\ No newline at end of file
@@ -6,6 +6,10 @@ A simple n-gram based language model that uses only built-in Python libraries.
 This version provides fallback functionality when NumPy is not available.
 """
 
+import ast
+import bisect
+import heapq
+import itertools
 import json
 import random
 import re
@@ -17,6 +21,19 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Word runs and sentence-ending punctuation, the only tokens the models keep
+_TOKEN_RE = re.compile(r'\w+|[.!?]')
+
+def _json_model_path(filepath: str) -> str:
+    """
+    Map a .npz model path to its .json sibling. The binary format needs NumPy,
+    so this model never writes JSON under a .npz name.
+    """
+    filepath = str(filepath)
+    if filepath.endswith('.npz'):
+        return filepath[:-len('.npz')] + '.json'
+    return filepath
+
 class SimpleLanguageModelBuiltin:
     """
     A simple n-gram based language model using only built-in Python libraries.
@@ -29,9 +46,10 @@ class SimpleLanguageModelBuiltin:
         self.word_to_id = {}
         self.id_to_word = {}
         self.vocabulary = set()
+        self._vocab_pool = ()
         self.word_counts = Counter()
         self.n_grams = defaultdict(lambda: defaultdict(int))
-        self.sentence_starters = []
+        self._set_sentence_starters([])
         self.is_trained = False
         
         # Basic grammar rules (the "non-dumb" part when no training data)
@@ -58,6 +76,7 @@ class SimpleLanguageModelBuiltin:
         
         # Preprocess and build vocabulary
         processed_sentences = []
+        sentence_starters = list(self.sentence_starters)
         for sentence in sentences:
             words = self._preprocess_sentence(sentence)
             if len(words) >= self.n_gram_size:
@@ -65,15 +84,16 @@ class SimpleLanguageModelBuiltin:
                 
                 # Track sentence starters
                 if words[0].istitle():
-                    self.sentence_starters.append(words[0])
+                    sentence_starters.append(words[0])
                 
                 # Update word counts
-                for word in words:
-                    self.word_counts[word] += 1
+                self.word_counts.update(words)
         
         # Filter vocabulary by minimum count
         self.vocabulary = {word for word, count in self.word_counts.items() 
                           if count >= self.min_word_count}
+        self._vocab_pool = tuple(self.vocabulary)
+        self._set_sentence_starters(sentence_starters)
         
         # Create word mappings
         self.word_to_id = {word: i for i, word in enumerate(sorted(self.vocabulary))}
@@ -90,33 +110,26 @@ class SimpleLanguageModelBuiltin:
                     next_word = filtered_sentence[i + self.n_gram_size - 1]
                     self.n_grams[n_gram][next_word] += 1
         
-        # Convert counts to probabilities
-        for n_gram in self.n_grams:
-            total_count = sum(self.n_grams[n_gram].values())
-            for word in self.n_grams[n_gram]:
-                self.n_grams[n_gram][word] /= total_count
+        # Convert counts to probabilities, rebuilding each row in one pass
+        for n_gram, next_words in self.n_grams.items():
+            total_count = sum(next_words.values())
+            self.n_grams[n_gram] = defaultdict(int, {word: count / total_count
+                                                     for word, count in next_words.items()})
         
         self.is_trained = True
         logger.info(f"Training completed. Vocabulary size: {len(self.vocabulary)}, "
                    f"N-grams: {len(self.n_grams)}")
     
+    def _set_sentence_starters(self, starters: List[str]) -> None:
+        """Set sentence_starters along with the distinct starters sampled from."""
+        self.sentence_starters = starters
+        self._starter_pool = tuple(set(starters))
+    
     def _preprocess_sentence(self, sentence: str) -> List[str]:
         """Preprocess a sentence into a list of words."""
-        # Basic cleaning
-        sentence = sentence.strip()
-        
-        # Split into words and punctuation
-        tokens = re.findall(r'\b\w+\b|[.!?;,]', sentence)
-        
-        # Filter out very short tokens and normalize
-        words = []
-        for token in tokens:
-            if token.isalpha() and len(token) > 1:
-                words.append(token.lower())
-            elif token in '.!?':
-                words.append(token)
-                
-        return words
+        # Keep alphabetic words of two or more letters and .!? in one pass
+        return [token for token in _TOKEN_RE.findall(sentence.lower())
+                if (len(token) > 1 and token.isalpha()) or token in '.!?']
     
     def generate_text(self, prompt: str = "", max_length: int = 100, temperature: float = 0.8) -> str:
         """
@@ -140,11 +153,11 @@ class SimpleLanguageModelBuiltin:
             words = [word for word in words if word in self.vocabulary]
         else:
             # Start with a random sentence starter
-            if self.sentence_starters:
-                starter = random.choice(list(set(self.sentence_starters)))
+            if self._starter_pool:
+                starter = random.choice(self._starter_pool)
                 words = [starter.lower()]
             else:
-                words = [random.choice(list(self.vocabulary))]
+                words = [random.choice(self._vocab_pool)]
         
         generated_words = words.copy()
         
@@ -166,7 +179,7 @@ class SimpleLanguageModelBuiltin:
                 
                 if not next_word_probs:
                     # Pick a random word from vocabulary
-                    next_word = random.choice(list(self.vocabulary))
+                    next_word = random.choice(self._vocab_pool)
                 else:
                     next_word = self._sample_word_builtin(next_word_probs, temperature)
             else:
@@ -183,37 +196,24 @@ class SimpleLanguageModelBuiltin:
     
     def _sample_word_builtin(self, word_probs: Dict[str, float], temperature: float) -> str:
         """Sample a word based on probabilities using built-in libraries."""
-        words = list(word_probs.keys())
-        probs = list(word_probs.values())
-        
         if temperature == 0:
             # Greedy selection
-            max_prob = max(probs)
-            max_index = probs.index(max_prob)
-            return words[max_index]
+            return max(word_probs.items(), key=lambda item: item[1])[0]
         
-        # Apply temperature scaling
+        # Build the unnormalized cumulative distribution in one pass, applying
+        # temperature scaling on the way
+        probs = word_probs.values()
         if temperature != 1.0:
-            probs = [math.pow(p, 1.0 / temperature) for p in probs]
+            inv_temperature = 1.0 / temperature
+            probs = (math.pow(p, inv_temperature) for p in probs)
+        cumulative = list(itertools.accumulate(probs))
         
-        # Normalize probabilities
-        total_prob = sum(probs)
-        if total_prob == 0:
-            return random.choice(words)
+        if cumulative[-1] == 0:
+            return random.choice(list(word_probs))
         
-        probs = [p / total_prob for p in probs]
-        
-        # Sample using cumulative distribution
-        rand_val = random.random()
-        cumulative = 0.0
-        
-        for word, prob in zip(words, probs):
-            cumulative += prob
-            if rand_val <= cumulative:
-                return word
-        
-        # Fallback (shouldn't reach here)
-        return words[-1]
+        # Binary search for the first word whose cumulative weight reaches the draw
+        index = bisect.bisect_left(cumulative, random.random() * cumulative[-1])
+        return next(itertools.islice(word_probs, min(index, len(cumulative) - 1), None))
     
     def _format_output(self, words: List[str]) -> str:
         """Format a list of words into readable text."""
@@ -290,12 +290,36 @@ class SimpleLanguageModelBuiltin:
             context_tuple = context_tuple[1:]
             next_word_probs = self.n_grams.get(context_tuple, {})
         
-        # Sort by probability and return top suggestions
-        suggestions = sorted(next_word_probs.items(), key=lambda x: x[1], reverse=True)
-        return suggestions[:num_suggestions]
+        # Return the top suggestions by probability
+        return heapq.nlargest(num_suggestions, next_word_probs.items(), key=lambda x: x[1])
     
-    def save_model(self, filepath: str) -> None:
-        """Save the trained model to a file."""
+    def suggest_next_words_batch(self, contexts: List[str], num_suggestions: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Suggest next words for several contexts at once.
+        
+        Args:
+            contexts: Text contexts
+            num_suggestions: Number of suggestions to return per context
+            
+        Returns:
+            One list of (word, probability) tuples per context
+        """
+        return [self.suggest_next_words(context, num_suggestions) for context in contexts]
+    
+    def save_model(self, filepath: str, compact: bool = True) -> None:
+        """
+        Save the trained model to a file.
+        
+        Args:
+            filepath: Path of the JSON file to write; a .npz suffix is
+                replaced by .json
+            compact: Write minified JSON instead of indented JSON
+        """
+        json_path = _json_model_path(filepath)
+        if json_path != str(filepath):
+            logger.warning(f"NumPy is not available, saving the model as JSON to {json_path}")
+            filepath = json_path
+        
         model_data = {
             'n_gram_size': self.n_gram_size,
             'min_word_count': self.min_word_count,
@@ -309,12 +333,16 @@ class SimpleLanguageModelBuiltin:
         }
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(model_data, f, indent=2, ensure_ascii=False)
+            if compact:
+                json.dump(model_data, f, separators=(',', ':'), ensure_ascii=False)
+            else:
+                json.dump(model_data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Model saved to {filepath}")
     
     def load_model(self, filepath: str) -> None:
-        """Load a trained model from a file."""
+        """Load a trained model from a JSON file; for a .npz path, its .json sibling."""
+        filepath = _json_model_path(filepath)
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 model_data = json.load(f)
@@ -324,15 +352,16 @@ class SimpleLanguageModelBuiltin:
             self.word_to_id = model_data['word_to_id']
             self.id_to_word = {int(k): v for k, v in model_data['id_to_word'].items()}
             self.vocabulary = set(model_data['vocabulary'])
+            self._vocab_pool = tuple(self.vocabulary)
             self.word_counts = Counter(model_data['word_counts'])
             
             # Reconstruct n_grams
             self.n_grams = defaultdict(lambda: defaultdict(int))
             for k, v in model_data['n_grams'].items():
-                key = eval(k)  # Convert string back to tuple
+                key = ast.literal_eval(k)  # Convert string back to tuple
                 self.n_grams[key] = defaultdict(int, v)
             
-            self.sentence_starters = model_data['sentence_starters']
+            self._set_sentence_starters(model_data['sentence_starters'])
             self.is_trained = model_data['is_trained']
             
             logger.info(f"Model loaded from {filepath}")
@@ -341,13 +370,18 @@ class SimpleLanguageModelBuiltin:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
-    def get_model_stats(self) -> Dict:
-        """Get statistics about the trained model."""
+    def get_model_stats(self, top_k: int = 10) -> Dict:
+        """
+        Get statistics about the trained model.
+        
+        Args:
+            top_k: Number of most common words to include
+        """
         return {
             'is_trained': self.is_trained,
             'vocabulary_size': len(self.vocabulary),
             'n_gram_size': self.n_gram_size,
             'total_n_grams': len(self.n_grams),
-            'sentence_starters': len(set(self.sentence_starters)),
-            'most_common_words': self.word_counts.most_common(10) if self.word_counts else []
+            'sentence_starters': len(self._starter_pool),
+            'most_common_words': self.word_counts.most_common(top_k) if self.is_trained and self.word_counts else []
         }
\ No newline at end of file
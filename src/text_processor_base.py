@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Text Processor - Shared Base
+
+Book loading, streaming, cleaning and filtering shared by TextProcessor and
+TextProcessorBuiltin. Uses only built-in Python libraries; subclasses supply
+the sentence splitter and may replace the text normalization.
+"""
+
+import codecs
+import io
+import mmap
+import multiprocessing
+import os
+import re
+import string
+from typing import Iterable, Iterator, List, Dict, Tuple
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+import logging
+
+from .uring_io import read_files, uring_enabled, write_files
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Patterns used on every book and sentence, compiled once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+_TITLE_SEPARATOR_RE = re.compile(r'[_\-]')
+_TITLE_LINE_RE = re.compile(r'^[A-Z][^.!?]*$')
+_SPACE_OR_SPECIAL_RE = re.compile(r'\s+|[^\w\s.!?;:,\'"()-]')
+# Matches only start where a space run starts; retrying from every space of a
+# long run not followed by punctuation would take quadratic time
+_PUNCT_RUN_RE = re.compile(r'(?<! ) *[.!?;:,][ .!?;:,]*')
+_REPEATED_PUNCT_RE = re.compile(r'\.{3,}|!{2,}|\?{2,}')
+_NON_WORD_OR_SPACE_RE = re.compile(r'[^\w\s]')
+_WORD_PAIR_RE = re.compile(r'\w\w')
+
+# Books with less text than this (ignoring surrounding whitespace) are skipped;
+# a file with fewer bytes is skipped without being opened
+_MIN_BOOK_LENGTH = 100
+
+# File names too generic to use as a title
+_GENERIC_TITLES = frozenset(['book', 'text', 'novel', 'story'])
+
+# Books are read, cleaned and split this many bytes at a time
+_READ_CHUNK_SIZE = 1 << 20
+
+# With io_uring enabled, books up to one read chunk are read this many at a time
+_PREFETCH_BATCH = 64
+
+# Below this many bytes of books in total, starting worker processes costs
+# more than it saves, so they are loaded serially
+_PARALLEL_MIN_BYTES = 16 << 20
+
+# Deletes ASCII letters and whitespace (every character \s matches, all below U+3001)
+_DELETE_LETTERS_AND_SPACE = str.maketrans('', '', string.ascii_letters + ''.join(
+    char for char in map(chr, range(0x3001)) if char.isspace()
+))
+
+def _collapse_repeated_punct(match: re.Match) -> str:
+    """Collapse a run of dots to an ellipsis and repeated ! or ? to one."""
+    return '...' if match.group()[0] == '.' else match.group()[0]
+
+def _fix_punct_run(match: re.Match) -> str:
+    """
+    Normalize one run of punctuation and spaces found by _PUNCT_RUN_RE:
+    spaces before punctuation are dropped, repeated punctuation is collapsed,
+    and a sentence end directly before a capital letter gets exactly one space.
+    """
+    run = match.group()
+    stripped = run.rstrip(' ')
+    punct = stripped.replace(' ', '')
+    if len(punct) > 1:
+        punct = _REPEATED_PUNCT_RE.sub(_collapse_repeated_punct, punct)
+    
+    trailing = run[len(stripped):]
+    next_char = match.string[match.end():match.end() + 1]
+    if punct[-1] in '.!?' and 'A' <= next_char <= 'Z':
+        trailing = ' '
+    return punct + trailing
+
+def _normalize_text(text: str) -> str:
+    """Run the _clean_text passes without stripping the ends."""
+    # Collapse whitespace runs and replace special characters (keeping
+    # basic punctuation) with a space, in one pass
+    text = _SPACE_OR_SPECIAL_RE.sub(' ', text)
+    
+    # Fix spacing around punctuation and remove repeated punctuation,
+    # one punctuation run at a time
+    return _PUNCT_RUN_RE.sub(_fix_punct_run, text)
+
+def _decode_chunks(buffer, encoding: str, errors: str) -> Iterator[str]:
+    """
+    Decode a bytes-like buffer _READ_CHUNK_SIZE bytes at a time, translating
+    newlines like text-mode open(). The incremental decoder keeps characters
+    split across two slices whole.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors), translate=True)
+    for start in range(0, len(buffer), _READ_CHUNK_SIZE):
+        text = decoder.decode(buffer[start:start + _READ_CHUNK_SIZE])
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+def _read_book_chunks(filepath: str, data: bytes, encoding: str, errors: str = 'strict') -> Iterator[str]:
+    """
+    Yield a book's text in decoded chunks. The file is memory-mapped so its
+    pages are read on demand instead of copied into one bytes object; data,
+    if given, is the file's content already read.
+    """
+    if data is not None:
+        yield from _decode_chunks(data, encoding, errors)
+        return
+        
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:  # Empty files cannot be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _decode_chunks(mapped, encoding, errors)
+
+def _last_word_cut(text: str, start: int = 1) -> int:
+    """
+    Index of the last position from start on between two word characters, or
+    0 if there is none. Neither the cleaning passes nor the sentence splitter
+    look across such a position, so text can be processed in pieces cut there.
+    """
+    for index in range(len(text) - 1, max(start, 1) - 1, -1):
+        if _WORD_PAIR_RE.match(text, index - 1):
+            return index
+    return 0
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on, honoring affinity masks."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS or Windows
+        return os.cpu_count() or 1
+
+def _worker_context():
+    """Multiprocessing context for book loading workers: forkserver if available, else spawn."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+class TextProcessorBase:
+    """
+    Loads .txt books from a directory and prepares their sentences for
+    training. Subclasses implement _split_into_sentences.
+    """
+    
+    # Cleaning passes used by _stream_book and _clean_text
+    _normalize_text = staticmethod(_normalize_text)
+    
+    def __init__(self, min_sentence_length: int = 10, max_sentence_length: int = 500):
+        self.min_sentence_length = min_sentence_length
+        self.max_sentence_length = max_sentence_length
+        self.book_data = []
+        self.word_counts = Counter()
+        
+    @property
+    def vocabulary(self):
+        """
+        Every word counted so far. A live set-like view of word_counts, so the
+        words are not stored a second time in their own set.
+        """
+        return self.word_counts.keys()
+    
+    def load_books_from_directory(self, directory_path: str) -> List[Dict]:
+        """
+        Load all .txt files from the specified directory.
+        
+        Args:
+            directory_path: Path to directory containing .txt book files
+            
+        Returns:
+            List of dictionaries containing book data
+        """
+        if not os.path.exists(directory_path):
+            logger.error(f"Directory not found: {directory_path}")
+            return []
+            
+        # DirEntry caches the name, path and file type from the directory read
+        with os.scandir(directory_path) as entries:
+            book_files = [(entry.name, entry.path, entry.stat().st_size) for entry in entries
+                          if entry.name.endswith('.txt') and entry.is_file()]
+        
+        if not book_files:
+            logger.warning(f"No .txt files found in {directory_path}")
+            return []
+            
+        logger.info(f"Found {len(book_files)} book files")
+        
+        # No encoding fits 100 characters into fewer than 100 bytes
+        for filename, _, size in book_files:
+            if size < _MIN_BOOK_LENGTH:
+                logger.warning(f"Skipping {filename}: too short")
+        book_files = [book for book in book_files if book[2] >= _MIN_BOOK_LENGTH]
+        
+        workers = min(len(book_files), _available_cpus())
+        if workers > 1 and sum(size for _, _, size in book_files) >= _PARALLEL_MIN_BYTES:
+            self._load_books_parallel(book_files, workers)
+            return self.book_data
+            
+        for start in range(0, len(book_files), _PREFETCH_BATCH):
+            batch = book_files[start:start + _PREFETCH_BATCH]
+            prefetched = self._prefetch_small_books(batch) if uring_enabled() else {}
+            for filename, filepath, _ in batch:
+                try:
+                    book_data = self._load_single_book(filepath, filename, prefetched.pop(filepath, None))
+                    if book_data:
+                        self.book_data.append(book_data)
+                        logger.info(f"Loaded: {filename}")
+                except Exception as e:
+                    logger.error(f"Error loading {filename}: {str(e)}")
+                    
+        return self.book_data
+    
+    def _prefetch_small_books(self, book_files: List[Tuple[str, str, int]]) -> Dict[str, bytes]:
+        """
+        Read every (filename, path, size) book no larger than one read chunk in
+        a single io_uring batch. Larger books are streamed by _load_single_book.
+        
+        Returns:
+            Dictionary mapping file paths to their contents
+        """
+        small = [filepath for _, filepath, size in book_files if size <= _READ_CHUNK_SIZE]
+        try:
+            return dict(zip(small, read_files(small)))
+        except OSError as e:
+            logger.warning(f"Batched read failed, reading books one at a time: {str(e)}")
+            return {}
+    
+    def _load_books_parallel(self, book_files: List[Tuple[str, str, int]], workers: int):
+        """
+        Load (filename, path, size) books in worker processes and merge their
+        results in file order. Each worker returns its book dict and the word
+        counts the book added.
+        """
+        # Training runs on worker threads, and forking a threaded process can
+        # copy locks held by other threads, so workers start from a clean process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context()) as executor:
+            futures = [
+                executor.submit(_load_book_worker, type(self), filepath, filename,
+                                self.min_sentence_length, self.max_sentence_length)
+                for filename, filepath, _ in book_files
+            ]
+            for (filename, _, _), future in zip(book_files, futures):
+                try:
+                    book_data, word_counts = future.result()
+                    if book_data:
+                        self.book_data.append(book_data)
+                        self.word_counts.update(word_counts)
+                        logger.info(f"Loaded: {filename}")
+                except Exception as e:
+                    logger.error(f"Error loading {filename}: {str(e)}")
+    
+    def _load_single_book(self, filepath: str, filename: str, data: bytes = None) -> Dict:
+        """
+        Load and process a single book file. If data is given it holds the
+        file's bytes, already read by _prefetch_small_books.
+        """
+        try:
+            head, filtered_sentences, lowered_sentences, word_count, text_length = self._stream_book(
+                _read_book_chunks(filepath, data, 'utf-8', 'ignore'))
+        except UnicodeDecodeError:
+            try:
+                head, filtered_sentences, lowered_sentences, word_count, text_length = self._stream_book(
+                    _read_book_chunks(filepath, data, 'latin1'))
+            except Exception as e:
+                logger.error(f"Could not read {filename}: {str(e)}")
+                return None
+                
+        if text_length < _MIN_BOOK_LENGTH:  # Skip very short files
+            logger.warning(f"Skipping {filename}: too short")
+            return None
+            
+        # Extract title from filename or content
+        title = self._extract_title(filename, head)
+        
+        if len(filtered_sentences) < 10:  # Skip books with too few good sentences
+            logger.warning(f"Skipping {filename}: too few good sentences")
+            return None
+            
+        # Update vocabulary and word counts
+        self._update_vocabulary(lowered_sentences)
+        
+        return {
+            'title': title,
+            'filename': filename,
+            'sentences': filtered_sentences,
+            'word_count': word_count,
+            'sentence_count': len(filtered_sentences)
+        }
+    
+    def _stream_book(self, chunks: Iterable[str]) -> Tuple[str, List[str], List[str], int, int]:
+        """
+        Clean, split and filter a book's text one non-empty chunk at a time,
+        so neither the raw nor the cleaned text is held in memory as a whole.
+        
+        Each chunk is cut at _last_word_cut and the rest carried over, and the
+        last (possibly unfinished) sentence is re-split with the next chunk.
+        
+        Returns:
+            Tuple of (raw text up to at least its tenth line, filtered
+            sentences, the same sentences lowercased, word count, length of
+            the raw text without surrounding whitespace)
+        """
+        head = ''
+        filtered_sentences = []
+        lowered_sentences = []
+        word_count = 0
+        carry = ''
+        pending = ''
+        offset = 0
+        text_start = None
+        text_end = 0
+        
+        # An empty chunk marks the end of the text
+        for chunk in chain(chunks, ('',)):
+            if head.count('\n') < 10:
+                head += chunk
+                
+            # Track where the raw text starts and ends without whitespace
+            if chunk and not chunk.isspace():
+                if text_start is None:
+                    text_start = offset + len(chunk) - len(chunk.lstrip())
+                text_end = offset + len(chunk.rstrip())
+            offset += len(chunk)
+            
+            text = carry + chunk
+            if chunk:
+                # The carried text has no cut position of its own
+                cut = _last_word_cut(text, len(carry))
+                text, carry = text[:cut], text[cut:]
+            
+            cleaned = self._normalize_text(text)
+            if cleaned:
+                word_count += len(cleaned.split())
+                if chunk:
+                    # The word at the cut continues in the next piece
+                    word_count -= 1
+                    
+            pending += cleaned
+            sentences = self._split_into_sentences(pending)
+            if chunk and sentences:
+                last_sentence = sentences.pop()
+                pending = pending[pending.rfind(last_sentence):]
+            filtered_sentences.extend(self._filter_sentences(sentences, lowered_sentences))
+            
+        text_length = text_end - text_start if text_start is not None else 0
+        return head, filtered_sentences, lowered_sentences, word_count, text_length
+    
+    def _extract_title(self, filename: str, content: str) -> str:
+        """Extract title from filename or content."""
+        # Try to get title from filename
+        title = os.path.splitext(filename)[0]
+        title = _TITLE_SEPARATOR_RE.sub(' ', title)
+        title = _WHITESPACE_RE.sub(' ', title).strip()
+        
+        # If title is generic or too short, try to extract from content
+        if len(title) < 3 or title.lower() in _GENERIC_TITLES:
+            # Look for title in first few lines
+            lines = content.split('\n')[:10]
+            for line in lines:
+                line = line.strip()
+                if len(line) > 3 and len(line) < 100 and not line.lower().startswith('chapter'):
+                    # Check if line looks like a title
+                    if _TITLE_LINE_RE.match(line) or line.isupper():
+                        title = line
+                        break
+                        
+        return title.title()
+    
+    def _clean_text(self, text: str) -> str:
+        """Clean and normalize text content."""
+        return self._normalize_text(text).strip()
+    
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """Split text into sentences."""
+        raise NotImplementedError
+    
+    def _filter_sentences(self, sentences: List[str], lowered_out: List[str] = None) -> List[str]:
+        """
+        Filter sentences based on length and quality criteria. If lowered_out
+        is given, the lowercased form of each kept sentence is appended to it.
+        """
+        filtered = []
+        min_length = self.min_sentence_length
+        max_length = self.max_sentence_length
+        # Checks run cheapest first; ratios use integer math
+        for sentence in sentences:
+            length = len(sentence)
+            
+            # Skip sentences that are too short or too long
+            if length < min_length or length > max_length:
+                continue
+                
+            # Skip sentences that are mostly uppercase (might be headers)
+            if length > 20 and sentence.isupper():
+                continue
+                
+            # Skip sentences with too many numbers or special characters (over 30%)
+            if len(sentence.translate(_DELETE_LETTERS_AND_SPACE)) * 10 > length * 3:
+                continue
+                
+            # Skip sentences with repeated words (under 60% unique, might be corrupted).
+            # More than five words needs at least five spaces, so shorter
+            # sentences are never split
+            lowered = sentence.lower()
+            if lowered.count(' ') >= 5:
+                words = lowered.split()
+                if len(words) > 5 and len(set(words)) * 10 < len(words) * 6:
+                    continue
+                
+            filtered.append(sentence)
+            if lowered_out is not None:
+                lowered_out.append(lowered)
+            
+        return filtered
+    
+    def _update_vocabulary(self, lowered_sentences: List[str]):
+        """Update word counts (and so the vocabulary) from lowercased sentences."""
+        # Strip non-word characters from the whole batch at once, then count
+        # every whitespace-separated word longer than one character
+        text = _NON_WORD_OR_SPACE_RE.sub('', '\n'.join(lowered_sentences))
+        words = [word for word in text.split() if len(word) > 1]
+        self.word_counts.update(words)
+    
+    def get_training_data(self) -> List[str]:
+        """Get all sentences from all books for training."""
+        all_sentences = []
+        for book in self.book_data:
+            all_sentences.extend(book['sentences'])
+        return all_sentences
+    
+    def get_statistics(self) -> Dict:
+        """Get statistics about the processed data."""
+        if not self.book_data:
+            return {}
+            
+        total_sentences = sum(book['sentence_count'] for book in self.book_data)
+        total_words = sum(book['word_count'] for book in self.book_data)
+        
+        return {
+            'num_books': len(self.book_data),
+            'total_sentences': total_sentences,
+            'total_words': total_words,
+            'vocabulary_size': len(self.vocabulary),
+            'avg_sentences_per_book': total_sentences / len(self.book_data),
+            'avg_words_per_book': total_words / len(self.book_data),
+            'books': [{'title': book['title'], 'sentences': book['sentence_count'], 
+                      'words': book['word_count']} for book in self.book_data]
+        }
+    
+    def create_sample_books(self, output_dir: str = "sample_books"):
+        """Create sample book files for testing if no books are provided."""
+        os.makedirs(output_dir, exist_ok=True)
+        
+        sample_books = [
+            {
+                'filename': 'adventure_tale.txt',
+                'content': '''The Adventure of the Lost Treasure
+
+Chapter 1: The Mysterious Map
+
+It was a dark and stormy night when Emma discovered the old map hidden in her grandmother's attic. The parchment was yellowed with age, and strange symbols marked various locations across what appeared to be a tropical island.
+
+"This could be the adventure I've been waiting for," she whispered to herself, carefully studying the intricate details drawn by some long-dead explorer.
+
+The next morning, Emma shared her discovery with her best friend Jake. His eyes widened as he examined the map under a magnifying glass.
+
+"Look at these markings," Jake pointed to a series of X marks scattered across the island. "This has to be a treasure map!"
+
+Chapter 2: The Journey Begins
+
+Within a week, the two friends had convinced Emma's uncle, a skilled sailor, to help them charter a boat to the Caribbean. The island depicted on the map matched a real location they found in maritime charts.
+
+As their vessel cut through the azure waters, Emma felt a mixture of excitement and nervousness. What would they find on the mysterious island? Would the treasure still be there after all these years?
+
+The island appeared on the horizon like a green jewel set in the endless blue. Palm trees swayed in the tropical breeze, and white beaches promised safe landing. But Emma knew that appearances could be deceiving.'''
+            },
+            {
+                'filename': 'fantasy_realm.txt',
+                'content': '''The Chronicles of Eldoria
+
+Book One: The Awakening Magic
+
+In the mystical realm of Eldoria, where dragons soared through crystal skies and ancient forests whispered secrets of old, a young apprentice named Lyra discovered she possessed a power that had been dormant for centuries.
+
+The Academy of Mystic Arts stood tall on the floating island of Aethermoor, its spires reaching toward the two moons that governed the magical cycles. Lyra had always felt different from the other students, unable to cast even the simplest spells.
+
+Master Thorne, the academy's most revered teacher, watched Lyra struggle with her studies. Little did anyone know that her apparent lack of magical ability was actually a sign of something far more powerful stirring within her.
+
+"Magic is not about forcing energy to bend to your will," Master Thorne often told his students. "True magic flows when you become one with the natural forces that surround us."
+
+One fateful evening, as Lyra practiced alone in the moonlit courtyard, she felt a strange warmth spreading through her hands. The air around her began to shimmer, and suddenly, flowers bloomed where she walked, and the ancient stone statues turned their heads to watch her pass.
+
+The other students gasped in amazement. What they witnessed was not ordinary magic, but the return of the legendary Nature's Heart - a power that could either save Eldoria from the encroaching darkness or destroy it entirely.'''
+            },
+            {
+                'filename': 'mystery_novel.txt',
+                'content': '''Death in the Library
+
+Chapter 1: A Quiet Evening Disturbed
+
+Detective Sarah Chen had always found libraries to be peaceful places, which made the call about a murder at the Grand Metropolitan Library all the more unsettling. The imposing building with its gothic architecture and vast collection had been the city's crown jewel for over a century.
+
+The victim was Dr. Marcus Whitfield, a renowned literature professor who had been researching rare manuscripts in the library's restricted section. Security cameras showed him entering the building at 6 PM, but his body wasn't discovered until the next morning.
+
+"What was he working on?" Chen asked the head librarian, Mrs. Eleanor Price, who had found the body.
+
+"Dr. Whitfield was examining some 16th-century texts," Mrs. Price replied, her voice shaking. "He had special permission to access our most valuable collection."
+
+The crime scene was puzzling. Dr. Whitfield lay sprawled among scattered books and papers, but there were no obvious signs of struggle. The murder weapon was nowhere to be found, and the restricted section had been locked from the inside.
+
+Chapter 2: Hidden Secrets
+
+As Detective Chen investigated further, she discovered that Dr. Whitfield had been close to a major discovery about a lost Shakespearean manuscript. His research notes suggested he had found evidence of a play that scholars had only theorized about.
+
+"Someone didn't want him to publish his findings," Chen mused, studying the professor's meticulous handwriting. "But who would kill for a 400-year-old play?"
+
+The answer lay hidden in the very books that surrounded the victim, waiting for a detective clever enough to read between the lines.'''
+            }
+        ]
+        
+        # One batched write (a single io_uring submission when enabled)
+        write_files([
+            (os.path.join(output_dir, book['filename']), book['content'].encode('utf-8'))
+            for book in sample_books
+        ])
+        
+        logger.info(f"Created {len(sample_books)} sample books in {output_dir}/")
+        return output_dir
+
+def _load_book_worker(processor_class: type, filepath: str, filename: str, min_sentence_length: int,
+                      max_sentence_length: int) -> Tuple[Dict, Counter]:
+    """Load one book in a worker process (module level so it can be pickled)."""
+    processor = processor_class(min_sentence_length, max_sentence_length)
+    return processor._load_single_book(filepath, filename), processor.word_counts
@@ -1 +1,61 @@
-THIS SHOULD BE A LINTER ERROR
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Text Processor - Built-in Libraries Version
+
+Loads and cleans .txt book files using only built-in Python libraries.
+This version provides fallback functionality when NLTK or pandas are not available.
+"""
+
+import re
+from typing import List
+
+from .text_processor_base import TextProcessorBase
+
+# Words that end with a period without ending the sentence
+_ABBREVIATIONS = frozenset([
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc', 'no', 'vol', 'fig'
+])
+
+# Sentence-ending punctuation (plus closing quotes/brackets) followed by
+# whitespace and something that can start a new sentence. Only the full run can
+# match, so matches start where a run starts, which keeps long runs linear
+_SENTENCE_END_RE = re.compile(r'(?<![.!?])[.!?]+["\')\]]*(?=\s+["\'(\[]?[A-Z0-9])')
+
+class TextProcessorBuiltin(TextProcessorBase):
+    """
+    Processes text files from a database directory for training the AI model,
+    using only built-in Python libraries.
+    Fallback version when NLTK or pandas are not available.
+    """
+    
+    def _split_into_sentences_builtin(self, text: str) -> List[str]:
+        """
+        Split text into sentences without NLTK.
+        
+        Periods after common abbreviations ("Dr.", "Mrs.") and single-letter
+        initials do not end a sentence, and decimals like "3.14" are never split
+        because a sentence break needs whitespace after the punctuation.
+        """
+        sentences = []
+        start = 0
+        
+        for match in _SENTENCE_END_RE.finditer(text):
+            end = match.start()
+            if text[end] == '.':
+                word_start = text.rfind(' ', start, end) + 1
+                word = text[word_start:end].lstrip('"\'([').lower()
+                if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                    continue
+            
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        
+        sentence = text[start:].strip()
+        if sentence:
+            sentences.append(sentence)
+        
+        return sentences
+    
+    _split_into_sentences = _split_into_sentences_builtin
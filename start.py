@@ -5,10 +5,14 @@ Quick Start Script for Book Writing AI Chatbot
 This script automatically sets up the environment and launches the application.
 """
 
+import hashlib
 import subprocess
 import sys
 import os
 
+# Written after a successful dependency check so later starts can skip it
+DEPS_SENTINEL = ".deps_ok"
+
 def install_dependencies():
     """Install required dependencies."""
     print("📦 Installing dependencies...")
@@ -35,22 +39,56 @@ def check_dependencies():
     
     return len(missing_packages) == 0, missing_packages
 
+def dependencies_key():
+    """Key a dependency check by requirements.txt and the running interpreter."""
+    try:
+        with open("requirements.txt", "rb") as f:
+            requirements = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(requirements + sys.executable.encode() + sys.version.encode()).hexdigest()
+
+def dependencies_cached(key):
+    """Check if an earlier run already found every dependency for this key."""
+    if key is None:
+        return False
+    try:
+        with open(DEPS_SENTINEL) as f:
+            return f.read().strip() == key
+    except OSError:
+        return False
+
+def mark_dependencies_ok(key):
+    """Record a successful dependency check for this key."""
+    if key is None:
+        return
+    try:
+        with open(DEPS_SENTINEL, "w") as f:
+            f.write(key)
+    except OSError:
+        pass
+
 def main():
     """Main startup function."""
     print("🚀 Book Writing AI Chatbot - Quick Start")
     print("=" * 50)
     
-    # Check if dependencies are installed
-    deps_installed, missing = check_dependencies()
-    
-    if not deps_installed:
-        print(f"⚠️  Missing dependencies: {', '.join(missing)}")
-        print("🔧 Installing dependencies...")
+    # Check if dependencies are installed, unless an earlier run already did
+    # for the same requirements and interpreter (importing them all is slow)
+    deps_key = dependencies_key()
+    if not dependencies_cached(deps_key):
+        deps_installed, missing = check_dependencies()
         
-        if not install_dependencies():
-            print("❌ Failed to install dependencies. Please run:")
-            print("   pip install -r requirements.txt")
-            return
+        if not deps_installed:
+            print(f"⚠️  Missing dependencies: {', '.join(missing)}")
+            print("🔧 Installing dependencies...")
+            
+            if not install_dependencies():
+                print("❌ Failed to install dependencies. Please run:")
+                print("   pip install -r requirements.txt")
+                return
+                
+        mark_dependencies_ok(deps_key)
     
     print("✅ All dependencies are ready!")
     print("\n🎯 Choose how to start:")
@@ -70,10 +108,9 @@ def main():
             
             try:
                 # Import and run the web app
-                from app import app, init_chatbot, create_template_files
+                from app import init_chatbot, run_server
                 init_chatbot()
-                create_template_files()
-                app.run(host='0.0.0.0', port=5000, debug=False)
+                run_server()
             except KeyboardInterrupt:
                 print("\n👋 Web server stopped. Goodbye!")
             except Exception as e:
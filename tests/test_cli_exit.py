@@ -0,0 +1,38 @@
+"""
+Regression test: CLI training must let the interpreter exit.
+
+Training runs on a worker thread; a parallel numba kernel launched from there
+used to leave the threading layer hanging at interpreter exit.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.text_processor_builtin import TextProcessorBuiltin
+
+
+class CliTrainExitTest(unittest.TestCase):
+
+    def test_train_exits(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            books_dir = os.path.join(workdir, 'books')
+            TextProcessorBuiltin().create_sample_books(books_dir)
+            model_path = os.path.join(workdir, 'x.npz')
+
+            result = subprocess.run(
+                [sys.executable, os.path.join(REPO_ROOT, 'cli.py'), '--model', model_path, 'train', books_dir],
+                cwd=workdir, capture_output=True, text=True, timeout=300
+            )
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(os.path.exists(model_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
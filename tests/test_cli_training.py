@@ -0,0 +1,75 @@
+"""
+Ctrl-C handling while the CLI trains.
+
+Outside an interactive session nothing would report a run left in the
+background, so an interrupt must still wait for training and print its results.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import wait
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import cli
+from src.text_processor_builtin import TextProcessorBuiltin
+
+
+def interrupt_first_wait():
+    """Side effect for cli.wait: raise KeyboardInterrupt once, then really wait."""
+    calls = []
+
+    def fake_wait(futures, timeout=None):
+        calls.append(futures)
+        if len(calls) == 1:
+            raise KeyboardInterrupt
+        return wait(futures, timeout=timeout)
+
+    return fake_wait
+
+
+class TrainInterruptTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.books_dir = os.path.join(tmp.name, 'books')
+        TextProcessorBuiltin().create_sample_books(self.books_dir)
+        self.model_path = os.path.join(tmp.name, 'model.npz')
+        self.cli = cli.BookWritingCLI()
+        self.cli.model_path = self.model_path
+
+    def train(self, background):
+        out = io.StringIO()
+        with mock.patch.object(cli, 'wait', side_effect=interrupt_first_wait()), \
+                contextlib.redirect_stdout(out):
+            self.cli.train_model(self.books_dir, background=background)
+        return out.getvalue()
+
+    def test_interrupt_waits_and_reports_results(self):
+        output = self.train(background=False)
+        self.assertIn('waiting for it to finish', output)
+        self.assertIn('Training completed successfully', output)
+        self.assertIsNone(self.cli._training)
+        self.assertTrue(os.path.exists(self.model_path))
+
+    def test_interrupt_in_background_mode_defers_results(self):
+        output = self.train(background=True)
+        self.assertIn('continues in the background', output)
+        self.assertNotIn('Training completed successfully', output)
+
+        wait((self.cli._training[0],))
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.cli._finish_training()
+        self.assertIn('Training completed successfully', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Save/load round trips for both language models.
+
+SimpleLanguageModel writes binary .npz archives (memory-mapped on load) or
+JSON; SimpleLanguageModelBuiltin only writes JSON, even for .npz paths.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.simple_model import SimpleLanguageModel
+from src.simple_model_builtin import SimpleLanguageModelBuiltin
+
+SENTENCES = [
+    'The cat sat on the mat.',
+    'The cat sat on the hat.',
+    'A dog ran to the park!',
+    'A dog ran to the gate?',
+] * 3
+
+
+class NumpyModelFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = SimpleLanguageModel()
+        self.model.train(SENTENCES)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def assert_same_model(self, loaded):
+        for name in ('context_keys', 'indptr', 'next_ids', 'probs'):
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(self.model, name), name)
+        self.assertEqual(loaded.probs.dtype, np.uint16)
+        self.assertEqual(loaded.id_to_word, self.model.id_to_word)
+        self.assertEqual(loaded.word_counts, self.model.word_counts)
+        self.assertEqual(sorted(loaded.sentence_starters), sorted(self.model.sentence_starters))
+        self.assertTrue(loaded.is_trained)
+        self.assertEqual(loaded.suggest_next_words('the cat'), self.model.suggest_next_words('the cat'))
+
+    def test_npz_round_trip_is_memory_mapped(self):
+        path = os.path.join(self.dir, 'model.npz')
+        self.model.save_model(path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(2), b'PK')
+
+        loaded = SimpleLanguageModel()
+        loaded.load_model(path)
+        self.assertIsInstance(loaded.probs, np.memmap)
+        self.assert_same_model(loaded)
+
+    def test_json_round_trip(self):
+        path = os.path.join(self.dir, 'model.json')
+        self.model.save_model(path)
+        with open(path, encoding='utf-8') as f:
+            json.load(f)
+
+        loaded = SimpleLanguageModel()
+        loaded.load_model(path)
+        self.assert_same_model(loaded)
+
+
+class BuiltinModelFileTest(unittest.TestCase):
+
+    def test_npz_path_is_saved_as_json(self):
+        model = SimpleLanguageModelBuiltin()
+        model.train(SENTENCES)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.npz')
+            model.save_model(path)
+
+            self.assertFalse(os.path.exists(path))
+            with open(os.path.join(tmp, 'model.json'), encoding='utf-8') as f:
+                self.assertTrue(json.load(f)['is_trained'])
+
+            loaded = SimpleLanguageModelBuiltin()
+            loaded.load_model(path)
+            self.assertEqual(dict(loaded.n_grams), dict(model.n_grams))
+            self.assertEqual(loaded.word_counts, model.word_counts)
+
+
+if __name__ == '__main__':
+    unittest.main()
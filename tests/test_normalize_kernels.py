@@ -0,0 +1,66 @@
+"""
+The numba cleanup kernels in text_processor must match the regex passes of
+text_processor_base exactly, for ASCII and non-ASCII text alike.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src import text_processor_base
+
+try:
+    from src import text_processor
+except ImportError:
+    text_processor = None
+
+CASES = [
+    '',
+    'Hello world',
+    'Hello , world . Next',
+    'Wait... what?? No!!! Yes.',
+    'Dots ..... and more . . . dots',
+    'Ends with a mark.',
+    'Ends with spaces .   ',
+    '   leading spaces, then text',
+    'Mixed\tspace\nand\r\nnewlines\x0b\x0c\x1c\x1f',
+    'Special #chars @ here & there * 100% ~ok~',
+    'Quotes "kept" and (parens) - dashes; colons: commas,',
+    'He said.Then left!And?Why',
+    'Sentence end.Capital next, but.lowercase',
+    '; ; ; ,,, ::',
+    'Ünïcödé text. Ωmega! 日本語？ café , naïve .',
+    'Emoji 🙂 here . And ― a dash',
+    'A long run of spaces' + ' ' * 1000 + 'then text.',
+]
+
+ALPHABET = list('aZ09_ .!?;:,\'"()-#\t\n\r\x0béΩ日') + ['...', '!!', '  ', 'A', 'b']
+
+
+@unittest.skipIf(text_processor is None or text_processor._fix_punct_runs_kernel is None,
+                 'numba, NLTK or pandas is not installed')
+class NormalizeKernelTest(unittest.TestCase):
+
+    def assert_matches_regex(self, text):
+        self.assertEqual(text_processor._normalize_text(text),
+                         text_processor_base._normalize_text(text), repr(text))
+
+    def test_known_cases(self):
+        for text in CASES:
+            self.assert_matches_regex(text)
+
+    def test_random_text(self):
+        rng = random.Random(1234)
+        for _ in range(2000):
+            self.assert_matches_regex(''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(60))))
+
+    def test_processor_uses_compiled_passes(self):
+        self.assertIs(text_processor.TextProcessor._normalize_text, text_processor._normalize_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Reply caching in front of /chat.
+
+Normalized messages are only cache keys: the bot must see the original text,
+and cache hits must still be recorded in the conversation history.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import app
+
+
+class ReplyCacheTest(unittest.TestCase):
+
+    def test_miss_then_hit(self):
+        cache = app.ReplyCache()
+        compute = mock.Mock(return_value='reply')
+        self.assertEqual(cache.get_or_compute('hi', 0, compute), ('reply', False))
+        self.assertEqual(cache.get_or_compute('hi', 0, compute), ('reply', True))
+        compute.assert_called_once_with()
+
+    def test_versions_are_separate(self):
+        cache = app.ReplyCache()
+        cache.get_or_compute('hi', 0, lambda: 'old')
+        self.assertEqual(cache.get_or_compute('hi', 1, lambda: 'new'), ('new', False))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = app.ReplyCache(maxsize=2)
+        cache.get_or_compute('a', 0, lambda: 'A')
+        cache.get_or_compute('b', 0, lambda: 'B')
+        cache.get_or_compute('a', 0, lambda: 'A')  # 'b' is now the oldest
+        cache.get_or_compute('c', 0, lambda: 'C')
+        self.assertTrue(cache.get_or_compute('a', 0, lambda: 'A2')[1])
+        self.assertEqual(cache.get_or_compute('b', 0, lambda: 'B2'), ('B2', False))
+
+    def test_clear(self):
+        cache = app.ReplyCache()
+        cache.get_or_compute('hi', 0, lambda: 'reply')
+        cache.clear()
+        self.assertFalse(cache.get_or_compute('hi', 0, lambda: 'reply')[1])
+
+
+@unittest.skipIf(app.np is None, 'the semantic cache needs NumPy')
+class SemanticReplyCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = app.SemanticReplyCache(capacity=4, dims=256, threshold=0.93)
+
+    def test_same_words_hit(self):
+        self.cache.add('write about dragons', 'reply', 0)
+        self.assertEqual(self.cache.lookup('dragons, write about!', 0), 'reply')
+
+    def test_different_words_miss(self):
+        self.cache.add('write about dragons', 'reply', 0)
+        self.assertIsNone(self.cache.lookup('cook some pasta', 0))
+
+    def test_threshold_is_respected(self):
+        # Without hash collisions the cosine similarity is 2 / sqrt(2 * 4) ~ 0.71
+        self.cache.add('a b c d', 'reply', 0)
+        self.assertIsNone(self.cache.lookup('a b', 0))
+
+        loose = app.SemanticReplyCache(threshold=0.7)
+        loose.add('a b c d', 'reply', 0)
+        self.assertEqual(loose.lookup('a b', 0), 'reply')
+
+    def test_new_version_drops_entries(self):
+        self.cache.add('write about dragons', 'reply', 0)
+        self.assertIsNone(self.cache.lookup('write about dragons', 1))
+        self.assertIsNone(self.cache.lookup('write about dragons', 0))
+
+    def test_oldest_entry_is_evicted(self):
+        for i in range(5):
+            self.cache.add(f'message{i}', f'reply{i}', 0)
+        self.assertIsNone(self.cache.lookup('message0', 0))
+        self.assertEqual(self.cache.lookup('message4', 0), 'reply4')
+
+    def test_messages_without_words_are_not_cached(self):
+        self.cache.add('?!', 'reply', 0)
+        self.assertIsNone(self.cache.lookup('?!', 0))
+
+
+class ChatRouteCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        app.init_chatbot()
+        # Exact-match caching only, so every repeat is an X-Cache HIT
+        patcher = mock.patch.object(app, 'semantic_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.app.test_client()
+
+    def post(self, message):
+        response = self.client.post('/chat', json={'message': message})
+        return response.headers['X-Cache'], response.get_json()['response']
+
+    def test_bot_sees_original_message_and_hits_are_recorded(self):
+        with mock.patch.object(app.chatbot, 'chat', wraps=app.chatbot.chat) as chat:
+            first = self.post('Write about DRAGONS')
+            second = self.post('  write about   dragons ')
+
+        chat.assert_called_once_with('Write about DRAGONS')
+        self.assertEqual(first[0], 'MISS')
+        self.assertEqual(second, ('HIT', first[1]))
+
+        history = list(app.chatbot.conversation_history)
+        self.assertEqual([turn['user'] for turn in history], ['Write about DRAGONS', '  write about   dragons '])
+        self.assertEqual([turn['bot'] for turn in history], [first[1], first[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
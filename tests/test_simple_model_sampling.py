@@ -0,0 +1,75 @@
+"""
+Sampling tests for SimpleLanguageModel.
+
+Probabilities are stored as uint16 weights, so raising them to 1/temperature
+must not overflow: low temperatures have to favour the most likely word.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src import simple_model
+from src.simple_model import SimpleLanguageModel
+
+
+def make_model():
+    """Bigram model where 'alpha' is followed by 'beta' 90% and 'gamma' 10% of the time."""
+    model = SimpleLanguageModel(n_gram_size=2)
+    model.train(['alpha beta'] * 18 + ['alpha gamma'] * 2)
+    return model
+
+
+class SampleWordTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = make_model()
+        self.row = self.model._find_context([self.model.word_to_id['alpha']])
+        self.beta = self.model.word_to_id['beta']
+
+    def test_low_temperature_picks_most_likely_word(self):
+        for temperature in (0.1, 0.01, 0.001):
+            with np.errstate(over='raise'):
+                picks = {self.model._sample_word(self.row, temperature) for _ in range(500)}
+            self.assertEqual(picks, {self.beta}, temperature)
+
+    def test_greedy(self):
+        self.assertEqual(self.model._sample_word(self.row, 0), self.beta)
+
+    def test_unit_temperature_follows_weights(self):
+        picks = [self.model._sample_word(self.row, 1.0) for _ in range(4000)]
+        share = picks.count(self.beta) / len(picks)
+        self.assertAlmostEqual(share, 0.9, delta=0.03)
+
+    def test_cdf_cache_is_reused(self):
+        self.model._sample_word(self.row, 0.5)
+        cdf = self.model._cdf_cache[(self.row, 0.5)]
+        self.model._sample_word(self.row, 0.5)
+        self.assertIs(self.model._cdf_cache[(self.row, 0.5)], cdf)
+        self.assertTrue(np.isfinite(cdf).all())
+
+
+@unittest.skipIf(simple_model._generate_kernel is None, 'numba is not installed')
+class GenerateKernelTest(unittest.TestCase):
+
+    def test_low_temperature_picks_most_likely_word(self):
+        model = make_model()
+        history = np.array([model.word_to_id['alpha']], dtype=np.int32)
+        for temperature in (0.1, 0.01, 0.001):
+            for seed in range(200):
+                ids = simple_model._generate_kernel(
+                    history, 1, model.n_gram_size, model._hash_base,
+                    np.asarray(model.context_keys), np.asarray(model.indptr), np.asarray(model.next_ids),
+                    np.asarray(model.probs), temperature, np.empty(0, dtype=np.int32),
+                    len(model.id_to_word), seed
+                )
+                self.assertEqual(ids.tolist(), [model.word_to_id['beta']], (temperature, seed))
+
+
+if __name__ == '__main__':
+    unittest.main()
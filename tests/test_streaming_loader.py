@@ -0,0 +1,94 @@
+"""
+Books are cleaned and split one chunk at a time; the result must not depend
+on where the chunk boundaries fall.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src import text_processor_base
+from src.text_processor_builtin import TextProcessorBuiltin
+
+try:
+    from src.text_processor import TextProcessor
+except ImportError:
+    TextProcessor = None
+
+PARAGRAPH = (
+    'Mr. Smith met Dr. Jones at 3.14 p.m. on the quay!!  "Where is the map?" he asked... '
+    'She pointed north , toward the old lighthouse.Nobody answered. '
+    'Café owners in Zürich said the ship had sailed ; it would not return?? '
+    'Chapter two began with rain -- heavy, cold rain (the worst in years).\n\n'
+)
+
+BOOK = 'THE TEST BOOK\n\nChapter 1\n\n' + PARAGRAPH * 12
+
+
+def head_lines(head):
+    return head.split('\n')[:10]
+
+
+class StreamBookTest(unittest.TestCase):
+
+    processor_classes = [TextProcessorBuiltin] + ([TextProcessor] if TextProcessor else [])
+
+    def stream(self, cls, chunks):
+        head, sentences, lowered, word_count, text_length = cls()._stream_book(iter(chunks))
+        return head_lines(head), sentences, lowered, word_count, text_length
+
+    def test_chunk_boundaries_do_not_change_the_result(self):
+        for cls in self.processor_classes:
+            expected = self.stream(cls, [BOOK])
+            self.assertGreater(len(expected[1]), 10)
+            for size in (1, 2, 3, 7, 64, 257, 1000):
+                chunks = [BOOK[i:i + size] for i in range(0, len(BOOK), size)]
+                self.assertEqual(self.stream(cls, chunks), expected, (cls.__name__, size))
+
+    def test_text_length_ignores_surrounding_whitespace(self):
+        for cls in self.processor_classes:
+            text_length = self.stream(cls, ['  \n', '\n  Some text. ', 'More  ', '\n\n'])[4]
+            self.assertEqual(text_length, len('Some text. More'))
+
+    def test_empty_book(self):
+        for cls in self.processor_classes:
+            self.assertEqual(self.stream(cls, []), ([''], [], [], 0, 0))
+
+
+class ReadBookChunksTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'book.txt')
+
+    def load(self, data, read_chunk_size):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        with mock.patch.object(text_processor_base, '_READ_CHUNK_SIZE', read_chunk_size):
+            return TextProcessorBuiltin()._load_single_book(self.path, 'book.txt')
+
+    def test_small_reads_match_one_read(self):
+        # CRLF pairs and multi-byte characters get split across reads
+        data = BOOK.replace('\n', '\r\n').encode('utf-8')
+        expected = self.load(data, 1 << 20)
+        self.assertIsNotNone(expected)
+        for size in (1, 2, 3, 5, 4096):
+            self.assertEqual(self.load(data, size), expected, size)
+
+    def test_decoded_chunks_translate_newlines(self):
+        data = 'a\r\nb\rc\nΩ'.encode('utf-8')
+        text = ''.join(text_processor_base._decode_chunks(data, 'utf-8', 'strict'))
+        with mock.patch.object(text_processor_base, '_READ_CHUNK_SIZE', 1):
+            split = ''.join(text_processor_base._decode_chunks(data, 'utf-8', 'strict'))
+        self.assertEqual(text, 'a\nb\nc\nΩ')
+        self.assertEqual(split, text)
+
+
+if __name__ == '__main__':
+    unittest.main()
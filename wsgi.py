@@ -0,0 +1,14 @@
+"""
+WSGI entry point for the Book Writing AI Chatbot web interface.
+
+Run it under a production server, for example:
+    waitress-serve --threads=8 wsgi:app
+    gunicorn --workers 1 --threads 8 wsgi:app
+
+Training jobs and their status live in process memory, so scale with
+threads inside a single worker process rather than multiple workers.
+"""
+
+from app import app, init_chatbot
+
+init_chatbot()
\ No newline at end of file